@@ -0,0 +1,75 @@
+"""
+Round-trip benchmark for save serialization.
+
+Parses a save once, re-serializes every top level node through the
+`to_raw_string` generators and through SaveFileSerializer, and reports the
+time of each path and whether the serializer output is byte identical to the
+original file, line endings included: the serializer keeps the CRLF endings of
+a save that uses them, while `to_raw_string` always produces bare newlines.
+
+Usage:
+    PYTHONPATH=. python benchmarks/roundtrip.py path/to/save.ck2 [--repeat 3]
+"""
+import argparse
+import io
+import time
+from pathlib import Path
+
+from ck2_savefile.session import SaveSession
+from ck2_savefile.serializer import SaveFileSerializer, SAVE_FILE_END
+
+
+def raw_string_roundtrip(nodes : list, first_line : str, encoding : str, newline : str) -> bytes:
+    parts = [first_line]
+    for node in nodes:
+        raw_string = node.to_raw_string()
+        if isinstance(raw_string, str):
+            parts.append(raw_string)
+        else:
+            parts.extend(raw_string)
+    parts.append(SAVE_FILE_END)
+    return ''.join(parts).encode(encoding)
+
+def serializer_roundtrip(nodes : list, first_line : str, encoding : str, newline : str) -> bytes:
+    sink = io.BytesIO()
+    with SaveFileSerializer(sink = sink, encoding = encoding, newline = newline) as serializer:
+        serializer.write_line(first_line)
+        serializer.write_all(nodes)
+        serializer.write_line(SAVE_FILE_END)
+    return sink.getvalue()
+
+def first_difference(original : bytes, produced : bytes) -> int | None:
+    for line_index , (left , right) in enumerate(zip(original.split(b'\n'), produced.split(b'\n'))):
+        if left != right:
+            return line_index
+    if len(original) != len(produced):
+        return min(original.count(b'\n'), produced.count(b'\n'))
+    return None
+
+def main():
+    argument_parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument('save_path', type = Path)
+    argument_parser.add_argument('--repeat', type = int, default = 3)
+    arguments = argument_parser.parse_args()
+
+    with SaveSession(arguments.save_path) as session:
+        original = session.mmap[:]
+        newline = '\r\n' if original[:original.find(b'\n') + 1].endswith(b'\r\n') else '\n'
+        response = session.parse_data()
+        _, first_line = response.first_line
+        nodes = list(response.generator)
+        encoding = session.encoding
+
+    for name , func in (('to_raw_string', raw_string_roundtrip), ('SaveFileSerializer', serializer_roundtrip)):
+        timings = []
+        for _ in range(arguments.repeat):
+            start = time.perf_counter()
+            produced = func(nodes, first_line, encoding, newline)
+            timings.append(time.perf_counter() - start)
+        difference = first_difference(original, produced)
+        identical = 'identical' if difference is None else f'differs from line {difference}'
+        print(f'{name:<20} best {min(timings):.3f}s over {arguments.repeat} runs, output {identical}')
+
+
+if __name__ == '__main__':
+    main()
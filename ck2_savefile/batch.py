@@ -0,0 +1,81 @@
+from pathlib import Path
+import os
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from ck2_savefile.parser import SaveFileParser
+from ck2_savefile.response import ParseResponse, SearchType
+from ck2_savefile.session import SaveSession
+
+QueryType = typing.Sequence[SearchType] | typing.Callable[[ParseResponse], typing.Any]
+ProgressFuncType = typing.Callable[[int, int, Path], None]
+
+
+@dataclass
+class BatchResult:
+    path : Path
+    value : typing.Any
+    error : str | None = None
+
+
+_worker_query : QueryType | None = None
+
+
+def _init_worker(query : QueryType) -> None:
+    """Receive the query once per worker process instead of once per save."""
+    global _worker_query
+    _worker_query = query
+
+def run_query(path : Path , query : QueryType) -> typing.Any:
+    """Run a query on one save: either a chain of search terms or a function of the ParseResponse."""
+    with SaveSession(path) as session:
+        response = SaveFileParser(file_path = path , session = session).parse_data()
+        if callable(query):
+            return query(response)
+        return list(response.get_by_search_term(*query))
+
+def _file_size(path : Path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _run_worker_query(path : Path) -> BatchResult:
+    try:
+        return BatchResult(path = path , value = run_query(path = path , query = _worker_query))
+    except Exception as error:
+        return BatchResult(path = path , value = None , error = f'{type(error).__name__}: {error}')
+
+def batch_query(paths : typing.Iterable[Path] ,
+                query : QueryType ,
+                max_workers : int | None = None ,
+                progress : ProgressFuncType | None = None
+                ) -> typing.Generator[BatchResult, None, None]:
+    """
+    Run the same query over many saves in a process pool, yielding results as they complete.
+
+    Saves are submitted largest first so the biggest files do not end up as
+    stragglers at the end of the run. The query is sent to every worker once, so
+    search terms and predicates must be picklable (no lambdas) and a function
+    query must be defined at module level. A failing save does not stop the
+    batch, its BatchResult carries the error instead.
+
+    Args:
+        paths (typing.Iterable[Path]): The saves to query.
+        query (QueryType): Search terms passed to get_by_search_term, or a function of the ParseResponse.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        progress (ProgressFuncType, optional): Called with (completed, total, path) after every save.
+    """
+    paths = sorted((Path(path) for path in paths), key = _file_size, reverse = True)
+    total = len(paths)
+    executor = ProcessPoolExecutor(max_workers = max_workers , initializer = _init_worker , initargs = (query,))
+    try:
+        futures = [executor.submit(_run_worker_query , path) for path in paths]
+        for completed , future in enumerate(as_completed(futures), start = 1):
+            result = future.result()
+            if progress is not None:
+                progress(completed, total, result.path)
+            yield result
+    finally:
+        executor.shutdown(wait = True , cancel_futures = True)
@@ -0,0 +1,137 @@
+from pathlib import Path
+import os
+import typing
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ck2_savefile.info_representation import InfoRepresentation, DictInfo, OptionalKeyDict
+
+FileState = tuple[int, int]
+CacheKey = tuple[str, tuple]
+
+
+@dataclass
+class CacheEntry:
+    file_state : FileState
+    values : list[InfoRepresentation]
+    cost : int
+
+
+def file_identity(file_path : Path | str) -> str:
+    return os.path.realpath(file_path)
+
+def file_state(file_path : Path | str) -> FileState:
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+def value_cost(value : InfoRepresentation) -> int:
+    """Size of a cached value, counted as the number of save lines it spans."""
+    if isinstance(value , (DictInfo , OptionalKeyDict)):
+        return value.end_index - value.start_index + 1
+    return 1
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of materialized search results.
+
+    Results are keyed by the real path of the save and the search chain, and
+    remember the modification time and size the file had when they were read, so
+    an entry is dropped as soon as the file changes. The cache is bounded both by
+    number of entries and by total cost, the number of save lines held.
+
+    Caching is opt-in: pass a SearchCache, such as the shared `search_cache`, to
+    SaveFileParser. Cached InfoRepresentation objects are shared between every
+    caller of the same search and must be treated as read-only; calling
+    `change_value` on them would leak the edit into later results.
+
+    Args:
+        max_entries (int, optional): Maximum number of cached searches. Defaults to 128.
+        max_cost (int, optional): Maximum number of save lines held by all entries. Defaults to 2_000_000.
+    """
+
+    def __init__(self , max_entries : int = 128 , max_cost : int = 2_000_000):
+        self.max_entries = max_entries
+        self.max_cost = max_cost
+        self.total_cost = 0
+        self._entries : OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self , key : CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.total_cost -= entry.cost
+
+    def get(self , file_path : Path | str , chain : tuple) -> list[InfoRepresentation] | None:
+        key = (file_identity(file_path), chain)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.file_state != file_state(file_path):
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.values
+
+    def put(self ,
+            file_path : Path | str ,
+            chain : tuple ,
+            values : list[InfoRepresentation] ,
+            state : FileState ,
+            cost : int | None = None
+            ) -> None:
+        if cost is None:
+            cost = sum(value_cost(value = value) for value in values)
+        if cost > self.max_cost:
+            return
+        key = (file_identity(file_path), chain)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = CacheEntry(file_state = state , values = values , cost = cost)
+            self.total_cost += cost
+            while len(self._entries) > self.max_entries or self.total_cost > self.max_cost:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self , file_path : Path | str | None = None) -> None:
+        """Drop every entry of a file, or the whole cache when no file is given."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self.total_cost = 0
+                return
+            identity = file_identity(file_path)
+            for key in [key for key in self._entries if key[0] == identity]:
+                self._pop(key)
+
+    def recording(self ,
+                  file_path : Path | str ,
+                  chain : tuple ,
+                  data : typing.Iterable[InfoRepresentation]
+                  ) -> typing.Generator[InfoRepresentation, None, None]:
+        """Pass `data` through and cache it once it has been fully consumed, unless it outgrows the cache."""
+        state = file_state(file_path)
+        values = []
+        cost = 0
+        try:
+            for value in data:
+                if values is not None:
+                    cost += value_cost(value = value)
+                    if cost > self.max_cost:
+                        values = None
+                    else:
+                        values.append(value)
+                yield value
+        finally:
+            close = getattr(data , 'close' , None)
+            if close is not None:
+                close()
+        if values is not None:
+            self.put(file_path = file_path , chain = chain , values = values , state = state , cost = cost)
+
+
+search_cache = SearchCache()
@@ -1,12 +1,15 @@
 from pathlib import Path
-from typing import List, Union, Generator
+from typing import List, Optional, Union, Generator
 
+from ck2_savefile.cache import SearchCache, search_cache
 from ck2_savefile.info_representation import SimpleInfoChange,ComplexChanges
 
 class EditorHandler:
-    def __init__(self, changes: List[Union[SimpleInfoChange, ComplexChanges]], file_path: Path):
+    def __init__(self, changes: List[Union[SimpleInfoChange, ComplexChanges]], file_path: Path,
+                 cache: Optional[SearchCache] = search_cache):
         self.changes = changes
         self.file_path = file_path
+        self.cache = cache
         self.content = self.read_file(file_path)
 
     def read_file(self, file_path: Path) -> List[str]:
@@ -36,4 +39,6 @@ class EditorHandler:
 
     def write_to_file(self, new_file_path: Path):
         with new_file_path.open('w') as file:
-            file.writelines(self.content)
\ No newline at end of file
+            file.writelines(self.content)
+        if self.cache is not None:
+            self.cache.invalidate(new_file_path)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import typing
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from ck2_savefile.info_representation import DictInfo, OptionalKeyDict
+
+
+@dataclass
+class BlockSpan:
+    start_index : int
+    end_index : int
+    depth : int
+    key : str | None
+    block_type : typing.Type[DictInfo] | typing.Type[OptionalKeyDict]
+    parent : int | None = None
+    children : dict[str, list[int]] = field(default_factory = dict)
+
+
+class BlockSpanIndex:
+    """
+    Line span of every DictInfo and OptionalKeyDict block of a save file.
+
+    Spans are stored in file order, so the innermost block enclosing a line is
+    found with one bisection followed by a walk up the parent chain, and a key
+    path is resolved with one dictionary lookup per level.
+
+    Args:
+        spans (list[BlockSpan]): The block spans ordered by their start line.
+    """
+
+    def __init__(self , spans : list[BlockSpan]):
+        self.spans = spans
+        self.start_indexes = [span.start_index for span in spans]
+        self.roots : dict[str, list[int]] = {}
+        for position , span in enumerate(spans):
+            siblings = self.roots if span.parent is None else spans[span.parent].children
+            if span.key is not None:
+                siblings.setdefault(span.key, []).append(position)
+
+    @staticmethod
+    def create(line_generator : typing.Iterable[tuple[int, str]]) -> typing.Self:
+        spans : list[BlockSpan] = []
+        open_spans : list[int] = []
+        pending_key : tuple[int, str] | None = None
+
+        for index , line in line_generator:
+
+            if DictInfo.corresponds(raw_info = line):
+                pending_key = (index , line.replace('\n','').replace('\t','').replace('=',''))
+                continue
+
+            if OptionalKeyDict.corresponds(raw_info = line):
+                if pending_key is not None:
+                    start_index , key = pending_key
+                    block_type = DictInfo
+                else:
+                    start_index = index
+                    key = line.split('=')[0].replace('\t','') if '=' in line else None
+                    block_type = OptionalKeyDict
+                spans.append(BlockSpan(
+                    start_index = start_index,
+                    end_index = -1,
+                    depth = len(open_spans),
+                    key = key,
+                    block_type = block_type,
+                    parent = open_spans[-1] if open_spans else None
+                ))
+                open_spans.append(len(spans) - 1)
+
+            elif line.endswith('}\n') and '{' not in line and open_spans:
+                spans[open_spans.pop()].end_index = index
+
+            pending_key = None
+
+        return BlockSpanIndex(spans = spans)
+
+    def enclosing(self , line_index : int) -> BlockSpan | None:
+        """Return the innermost block whose span contains the given line."""
+        position = bisect_right(self.start_indexes, line_index) - 1
+        while position is not None and position >= 0:
+            span = self.spans[position]
+            if span.end_index >= line_index:
+                return span
+            position = span.parent
+        return None
+
+    def resolve(self , key_path : str | typing.Sequence[str]) -> BlockSpan | None:
+        """Return the first block reached by following `key_path` (e.g. 'title/k_france')."""
+        keys = key_path.split('/') if isinstance(key_path, str) else key_path
+        siblings = self.roots
+        span = None
+        for key in keys:
+            positions = siblings.get(key)
+            if not positions:
+                return None
+            span = self.spans[positions[0]]
+            siblings = span.children
+        return span
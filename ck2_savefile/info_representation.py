@@ -1,5 +1,7 @@
 from pathlib import Path
 import typing
+import copy
+from array import array
 from dataclasses import dataclass
 
 @dataclass
@@ -17,7 +19,7 @@ class SimpleInfoChange :
 @dataclass
 class ComplexChanges:
     insertion_index : int
-    insertion_generator : typing.Generator[str, None, None]
+    insertion_generator : typing.Iterable[str]
     
 
 class InfoRepresentation(typing.Protocol):
@@ -38,9 +40,16 @@ class InfoRepresentation(typing.Protocol):
     def last_line_position(self) -> LastPositionData:
         pass
     
+    @property
+    def first_line_index(self) -> int:
+        pass
+    
     @staticmethod
     def create_from_dict(input_dict : dict) -> typing.Self:
         pass
+    
+    def reposition(self , index : int , depth : int) -> int:
+        pass
 
     
 class OneLineKeyValueInfo:
@@ -96,6 +105,25 @@ class OneLineKeyValueInfo:
             last_line_end = self.end_spaces
         )
     
+    @property
+    def first_line_index(self) -> int:
+        return self.index
+    
+    @staticmethod
+    def create_from_dict(input_dict : dict) -> typing.Self:
+        return OneLineKeyValueInfo(
+            index = 0,
+            data_key = input_dict['data_key'],
+            data_value = str(input_dict['data_value']),
+            start_spaces = 0,
+            end_spaces = 1
+        )
+    
+    def reposition(self , index : int , depth : int) -> int:
+        self.index = index
+        self.start_spaces = depth
+        return index + 1
+    
 
         
 class MultiKeyValueInfo():
@@ -115,7 +143,7 @@ class MultiKeyValueInfo():
         start_spaces = raw_info.count('\t')
         end_spaces = raw_info.count('\n')
         
-        data_raw = raw_info.replace('\n' , '').replace('\t ', '')
+        data_raw = raw_info.replace('\n' , '').replace('\t', '')
         pairs = data_raw.split(' ')
         data = [OneLineKeyValueInfo.create(raw_info=x , index = index) 
                 for x in pairs if '=' in x]
@@ -158,6 +186,86 @@ class MultiKeyValueInfo():
             last_line_start = self.start_space,
             last_line_end = self.end_spaces
         )
+    
+    @property
+    def first_line_index(self) -> int:
+        return self.index
+    
+    @staticmethod
+    def create_from_dict(input_dict : dict) -> typing.Self:
+        values = [OneLineKeyValueInfo(index = 0,
+                                      data_key = key,
+                                      data_value = str(value),
+                                      start_spaces = 0,
+                                      end_spaces = 0)
+                  for key , value in input_dict['values'].items()]
+        return MultiKeyValueInfo(
+            index = 0,
+            values = values,
+            start_space = 0,
+            end_spaces = 1
+        )
+    
+    def reposition(self , index : int , depth : int) -> int:
+        self.index = index
+        self.start_space = depth
+        for value in self.values:
+            value.index = index
+        return index + 1
+
+def _int_array(tokens : list[str]) -> array | None:
+    try:
+        if not all(token == str(int(token)) for token in tokens):
+            return None
+    except ValueError:
+        return None
+    for typecode in ('i' , 'q'):
+        try:
+            return array(typecode , (int(token) for token in tokens))
+        except OverflowError:
+            continue
+    return None
+
+def _float_array(tokens : list[str]) -> tuple[array , int] | None:
+    separator = tokens[0].find('.')
+    if separator == -1:
+        return None
+    precision = len(tokens[0]) - separator - 1
+    values = array('d' , (float(token) for token in tokens))
+    if not all(token == f'{value:.{precision}f}' for token , value in zip(tokens , values)):
+        return None
+    return values , precision
+
+def compact_tokens(tokens : list[str]) -> tuple[list[str] | array , int | None , tuple[int , int]]:
+    """
+    Store a list of integers as array('i') and of decimals sharing one precision as array('d').
+
+    Returns the values, the decimal precision of a float array and the number of
+    empty tokens (from doubled or trailing spaces) around the values, which is all
+    that is needed to write the exact same line back. Anything else stays a list of
+    str, with the same padding stripped, so `info_list` holds ints or floats for a
+    numeric list and str tokens otherwise.
+    """
+    leading = 0
+    while leading < len(tokens) and tokens[leading] == '':
+        leading += 1
+    trailing = 0
+    while trailing < len(tokens) - leading and tokens[len(tokens) - 1 - trailing] == '':
+        trailing += 1
+    values = tokens[leading:len(tokens) - trailing]
+    if not values:
+        return values , None , (leading , trailing)
+    try:
+        int_values = _int_array(tokens = values)
+        if int_values is not None:
+            return int_values , None , (leading , trailing)
+        float_values = _float_array(tokens = values)
+        if float_values is not None:
+            return float_values[0] , float_values[1] , (leading , trailing)
+    except ValueError:
+        pass
+    return values , None , (leading , trailing)
+
 
 class OneLineListInfo:
     def __init__(self ,
@@ -167,10 +275,70 @@ class OneLineListInfo:
                  end_spaces : int
                  ):
         self.index = index
-        self.info_list = info_list
+        self._set_tokens(tokens = info_list)
         self.start_spaces = start_spaces
         self.end_spaces = end_spaces
     
+    def _set_tokens(self , tokens : typing.Iterable[typing.Any]) -> None:
+        self.info_list , self.float_precision , self.padding = compact_tokens(tokens = [str(x) for x in tokens])
+    
+    def tokens(self) -> list[str]:
+        """Return the list as the str tokens written in the save."""
+        if not isinstance(self.info_list , array):
+            values = self.info_list
+        elif self.info_list.typecode == 'd':
+            values = [f'{value:.{self.float_precision}f}' for value in self.info_list]
+        else:
+            values = [str(value) for value in self.info_list]
+        leading , trailing = self.padding
+        if leading or trailing:
+            return [''] * leading + values + [''] * trailing
+        return values
+    
+    def _as_item(self , value : typing.Any) -> typing.Any:
+        """Convert `value` to the stored item type, raising ValueError if it cannot be equal to any item."""
+        if not isinstance(self.info_list , array):
+            return str(value)
+        if isinstance(value , bool):
+            raise ValueError(f'{value} is not a number of the list')
+        if self.info_list.typecode == 'd':
+            return float(value)
+        item = int(value)
+        if not isinstance(value , str) and item != value:
+            raise ValueError(f'{value} is not an integer')
+        return item
+    
+    def __len__(self) -> int:
+        return len(self.info_list)
+    
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return iter(self.info_list)
+    
+    def __contains__(self , value : typing.Any) -> bool:
+        try:
+            return self._as_item(value = value) in self.info_list
+        except (ValueError , TypeError):
+            return False
+    
+    def _as_items(self , values : typing.Iterable[typing.Any]) -> set:
+        items = set()
+        for value in values:
+            try:
+                items.add(self._as_item(value = value))
+            except (ValueError , TypeError):
+                # a value that matches no item, so issuperset fails and intersects ignores it
+                items.add(object())
+        return items
+    
+    def as_set(self) -> frozenset:
+        return frozenset(self.info_list)
+    
+    def intersects(self , values : typing.Iterable[typing.Any]) -> bool:
+        return not self.as_set().isdisjoint(self._as_items(values = values))
+    
+    def issuperset(self , values : typing.Iterable[typing.Any]) -> bool:
+        return self.as_set().issuperset(self._as_items(values = values))
+    
     @staticmethod
     def create(raw_info : str , index : int) -> typing.Self:
         
@@ -190,10 +358,10 @@ class OneLineListInfo:
         return '=' not in raw_info and raw_info.count(' ') > 1
     
     def to_raw_string(self) -> str:
-        return '\t' * self.start_spaces + ' '.join(self.info_list) + '\n' * self.end_spaces
+        return '\t' * self.start_spaces + ' '.join(self.tokens()) + '\n' * self.end_spaces
     
     def change_value(self , other_list : list[str])-> SimpleInfoChange:
-        self.info_list = other_list
+        self._set_tokens(tokens = other_list)
         
         return SimpleInfoChange(
             line_number = self.index,
@@ -206,6 +374,24 @@ class OneLineListInfo:
             last_line_start = self.start_spaces,
             last_line_end = self.end_spaces
         )
+    
+    @property
+    def first_line_index(self) -> int:
+        return self.index
+    
+    @staticmethod
+    def create_from_dict(input_dict : dict) -> typing.Self:
+        return OneLineListInfo(
+            index = 0,
+            info_list = input_dict['info_list'],
+            start_spaces = 0,
+            end_spaces = 1
+        )
+    
+    def reposition(self , index : int , depth : int) -> int:
+        self.index = index
+        self.start_spaces = depth
+        return index + 1
 
 class OneLineKeyListInfo:
     
@@ -246,8 +432,26 @@ class OneLineKeyListInfo:
         data_list_str = self.data_list.to_raw_string().replace('\t','{').replace('\n','}')
         
         return "\t" *self.start_spaces + f'{self.data_key}={data_list_str}' + "\n"*self.end_spaces
+    def __len__(self) -> int:
+        return len(self.data_list)
+    
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return iter(self.data_list)
+    
+    def __contains__(self , value : typing.Any) -> bool:
+        return value in self.data_list
+    
+    def as_set(self) -> frozenset:
+        return self.data_list.as_set()
+    
+    def intersects(self , values : typing.Iterable[typing.Any]) -> bool:
+        return self.data_list.intersects(values = values)
+    
+    def issuperset(self , values : typing.Iterable[typing.Any]) -> bool:
+        return self.data_list.issuperset(values = values)
+    
     def change_value(self , other_list : list[str])-> SimpleInfoChange:
-        self.data_list = other_list
+        self.data_list.change_value(other_list = other_list)
         
         return SimpleInfoChange(
             line_number = self.index,
@@ -260,6 +464,32 @@ class OneLineKeyListInfo:
             last_line_start = self.start_spaces,
             last_line_end = self.end_spaces
         )
+    
+    @property
+    def first_line_index(self) -> int:
+        return self.index
+    
+    @staticmethod
+    def create_from_dict(input_dict : dict) -> typing.Self:
+        data_list = OneLineListInfo(
+            index = 0,
+            info_list = input_dict['data_list'],
+            start_spaces = 1,
+            end_spaces = 1
+        )
+        return OneLineKeyListInfo(
+            index = 0,
+            data_key = input_dict['data_key'],
+            data_list = data_list,
+            start_spaces = 0,
+            end_spaces = 1
+        )
+    
+    def reposition(self , index : int , depth : int) -> int:
+        self.index = index
+        self.data_list.index = index
+        self.start_spaces = depth
+        return index + 1
 class DictInfo:
     
     def __init__(self ,
@@ -299,31 +529,32 @@ class DictInfo:
         
         for index,line in ck2generator:
             
+            # the checks are exclusive and in the order of SaveFileParser, as a key={ line matches several of them
             if OneLineKeyValueInfo.corresponds(raw_info = line):
                 
                 new_value = OneLineKeyValueInfo.create(raw_info = line , index = index)
                 dict_data.append(new_value)
             
-            if MultiKeyValueInfo.corresponds(raw_info= line):
+            elif MultiKeyValueInfo.corresponds(raw_info= line):
                 
                 new_value = MultiKeyValueInfo.create(raw_info= line , index = index)
                 dict_data.append(new_value)
             
-            if OneLineListInfo.corresponds(raw_info = line):
+            elif OneLineListInfo.corresponds(raw_info = line):
                 
                 new_value = OneLineListInfo.create(raw_info = line, index = index)
                 dict_data.append(new_value)
             
-            if OneLineKeyListInfo.corresponds(raw_info = line):
-                
-                new_value = OneLineKeyListInfo.create(raw_info = line, index = index)
+            elif OptionalKeyDict.corresponds(raw_info=line):
+                new_value = OptionalKeyDict.create(first_line = line,start_index = index , ck2generator = ck2generator)
                 dict_data.append(new_value)
             
-            if OptionalKeyDict.corresponds(raw_info=line):
-                new_value = OptionalKeyDict.create(first_line = line,start_index = index , ck2generator = ck2generator)
+            elif OneLineKeyListInfo.corresponds(raw_info = line):
+                
+                new_value = OneLineKeyListInfo.create(raw_info = line, index = index)
                 dict_data.append(new_value)
             
-            if DictInfo.corresponds(raw_info = line):
+            elif DictInfo.corresponds(raw_info = line):
                 
                 new_value = DictInfo.create(raw_key_data = line , start_index= index, ck2generator = ck2generator)
                 dict_data.append(new_value)
@@ -362,54 +593,54 @@ class DictInfo:
     @property
     def last_line_position(self) -> LastPositionData:
         return LastPositionData(
-            last_line_index = self.last_line_position,
+            last_line_index = self.end_index,
             last_line_start = self.start_spaces,
             last_line_end = self.end_spaces
         )
-    def _extend_one_line_key_value_info(self ,
-                                        input : dict |  OneLineKeyValueInfo,
-                                        last_line_data : LastPositionData
-                                        ) -> ComplexChanges:
-        
-        if isinstance(input , OneLineKeyListInfo):
-            
-            input.end_spaces = last_line_data.last_line_end
-            input.start_spaces = last_line_data.last_line_start
-            
-            return ComplexChanges(
-                insertion_index = last_line_data.last_line_index + 1,
-                insertion_generator = (x for x in [input.to_raw_string()])
-            )
-        
-        new_line = OneLineKeyValueInfo(
-            index = last_line_data.last_line_index + 1 ,
-            data_key = input.get('data_key'),
-            data_value= input.get('data_value'),
-            start_spaces= last_line_data.last_line_start ,
-            end_spaces = last_line_data.last_line_end
-        )
-        
-        return ComplexChanges(
-            insertion_index = new_line.index,
-            insertion_generator= (x for x in [new_line.to_raw_string()])
+    
+    @property
+    def first_line_index(self) -> int:
+        return self.start_index
+    
+    @staticmethod
+    def create_from_dict(input_dict : dict) -> typing.Self:
+        new_dict = DictInfo(
+            start_index = 0,
+            end_index = 0,
+            key = input_dict['key'],
+            value = create_values_from_python(input_value = input_dict.get('value', [])),
+            start_spaces = 0,
+            end_spaces = 1
         )
-    def _extend_dict_info(self, 
-                          input : dict | typing.Self ,
-                          last_line_data : LastPositionData
-                          ) -> ComplexChanges:
-        if isinstance(input,dict):
-            pass
-        
-    def extend(self , input : dict | InfoRepresentation , class_type : typing.Type[InfoRepresentation]) -> ComplexChanges:
-        final_value = self.value[-1]
-        last_line_data = final_value.last_line_position 
-        if issubclass(class_type, OneLineKeyValueInfo):
-            
-            return self._extend_one_line_key_value_info(input = input ,
-                                                        last_line_data = last_line_data
-                                                        )
-        if issubclass(class_type , DictInfo):
-            pass
+        new_dict.reposition(index = 0 , depth = 0)
+        return new_dict
+    
+    def reposition(self , index : int , depth : int) -> int:
+        self.start_index = index
+        self.start_spaces = depth
+        next_index = index + 2
+        for value in self.value:
+            next_index = value.reposition(index = next_index , depth = depth + 1)
+        self.end_index = next_index
+        return next_index + 1
+    
+    def extend(self ,
+               input : dict | InfoRepresentation ,
+               class_type : typing.Type[InfoRepresentation] | None = None ,
+               position : int | None = None
+               ) -> ComplexChanges:
+        """
+        Build the change inserting a new child at the end of the block or before the child at `position`.
+
+        The tree itself is left untouched, so several changes computed from the same
+        block can be applied together by the EditorHandler.
+        """
+        return extend_block(block = self ,
+                            input = input ,
+                            class_type = class_type ,
+                            position = position,
+                            empty_depth = self.start_spaces + 1
+                            )
             
     
     
@@ -450,35 +681,36 @@ class OptionalKeyDict:
         dict_data = []
         for index , line in ck2generator:
             
+            # the checks are exclusive and in the order of SaveFileParser, as a key={ line matches several of them
             if OneLineKeyValueInfo.corresponds(raw_info = line):
                 
                 new_value = OneLineKeyValueInfo.create(raw_info = line , index= index)
                 dict_data.append(new_value)
             
-            if MultiKeyValueInfo.corresponds(raw_info= line):
+            elif MultiKeyValueInfo.corresponds(raw_info= line):
                 
                 new_value = MultiKeyValueInfo.create(raw_info= line, index= index)
                 dict_data.append(new_value)
             
-            if OneLineListInfo.corresponds(raw_info = line):
+            elif OneLineListInfo.corresponds(raw_info = line):
                 
                 new_value = OneLineListInfo.create(raw_info = line, index= index)
                 dict_data.append(new_value)
             
-            if OneLineKeyListInfo.corresponds(raw_info = line):
+            elif OptionalKeyDict.corresponds(raw_info=line):
+                new_value = OptionalKeyDict.create(first_line = line,start_index = index , ck2generator = ck2generator)
+                dict_data.append(new_value)
+            
+            elif OneLineKeyListInfo.corresponds(raw_info = line):
                 
                 new_value = OneLineKeyListInfo.create(raw_info = line, index= index)
                 dict_data.append(new_value)
             
-            if DictInfo.corresponds(raw_info = line):
+            elif DictInfo.corresponds(raw_info = line):
                 
                 new_value = DictInfo.create(raw_key_data = line ,start_index=index, ck2generator = ck2generator)
                 dict_data.append(new_value)
             
-            if OptionalKeyDict.corresponds(raw_info=line):
-                new_value = OptionalKeyDict.create(first_line = line,start_index = start_index , ck2generator = ck2generator)
-                dict_data.append(new_value)
-            
             if line.endswith('}\n') and '{' not in line:
                 last_line_spaces = line.count('\t')
                 return OptionalKeyDict(
@@ -512,7 +744,107 @@ class OptionalKeyDict:
     @property
     def last_line_position(self) -> LastPositionData:
         return LastPositionData(
-            last_line_index = self.last_line_position,
+            last_line_index = self.end_index,
             last_line_start = self.last_line_start,
             last_line_end = 1
-        )
\ No newline at end of file
+        )
+    
+    @property
+    def first_line_index(self) -> int:
+        return self.start_index
+    
+    @staticmethod
+    def create_from_dict(input_dict : dict) -> typing.Self:
+        new_dict = OptionalKeyDict(
+            start_index = 0,
+            end_index = 0,
+            first_line_start = 0,
+            last_line_start = 0,
+            value = create_values_from_python(input_value = input_dict.get('value', [])),
+            key = input_dict.get('key')
+        )
+        new_dict.reposition(index = 0 , depth = 0)
+        return new_dict
+    
+    def reposition(self , index : int , depth : int) -> int:
+        self.start_index = index
+        self.first_line_start = depth
+        self.last_line_start = depth
+        next_index = index + 1
+        for value in self.value:
+            next_index = value.reposition(index = next_index , depth = depth + 1)
+        self.end_index = next_index
+        return next_index + 1
+    
+    def extend(self ,
+               input : dict | InfoRepresentation ,
+               class_type : typing.Type[InfoRepresentation] | None = None ,
+               position : int | None = None
+               ) -> ComplexChanges:
+        """
+        Build the change inserting a new child at the end of the block or before the child at `position`.
+
+        The tree itself is left untouched, so several changes computed from the same
+        block can be applied together by the EditorHandler.
+        """
+        return extend_block(block = self ,
+                            input = input ,
+                            class_type = class_type ,
+                            position = position,
+                            empty_depth = self.first_line_start + 1
+                            )
+
+
+def create_value_from_python(key : str , value : typing.Any) -> InfoRepresentation:
+    if isinstance(value , dict):
+        return DictInfo.create_from_dict(input_dict = {'key' : key , 'value' : value})
+    if isinstance(value , (list , tuple)):
+        return OneLineKeyListInfo.create_from_dict(input_dict = {'data_key' : key , 'data_list' : value})
+    return OneLineKeyValueInfo.create_from_dict(input_dict = {'data_key' : key , 'data_value' : value})
+
+def create_values_from_python(input_value : dict | list) -> list[InfoRepresentation]:
+    """
+    Convert python data into block children.
+
+    A dict maps keys to values, a list holds (key, value) pairs or ready made
+    InfoRepresentation objects, which allows repeated keys and keyless blocks.
+    Nested dicts become DictInfo, lists and tuples become OneLineKeyListInfo and
+    anything else a OneLineKeyValueInfo written verbatim.
+    """
+    items = input_value.items() if isinstance(input_value , dict) else input_value
+    values = []
+    for item in items:
+        if isinstance(item , tuple):
+            key , value = item
+            values.append(create_value_from_python(key = key , value = value))
+        else:
+            values.append(item)
+    return values
+
+def extend_block(block : DictInfo | OptionalKeyDict ,
+                 input : dict | InfoRepresentation ,
+                 class_type : typing.Type[InfoRepresentation] | None ,
+                 position : int | None ,
+                 empty_depth : int
+                 ) -> ComplexChanges:
+    # nodes given directly or inside a dict keep their own index, and later edits to them must not leak into the change
+    input = copy.deepcopy(input)
+    if isinstance(input , dict):
+        if class_type is None:
+            raise ValueError('A class_type is required to extend a block with a dict.')
+        new_value = class_type.create_from_dict(input_dict = input)
+    else:
+        new_value = input
+    
+    if position is None or position >= len(block.value):
+        insertion_index = block.end_index
+        depth = block.value[-1].last_line_position.last_line_start if block.value else empty_depth
+    else:
+        insertion_index = block.value[position].first_line_index
+        depth = block.value[position].last_line_position.last_line_start
+    
+    new_value.reposition(index = insertion_index , depth = depth)
+    
+    # imported here since the serializer itself depends on this module
+    from ck2_savefile.serializer import SaveFileSerializer
+    return SaveFileSerializer.complex_change(node = new_value , insertion_index = insertion_index)
\ No newline at end of file
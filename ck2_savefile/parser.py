@@ -1,5 +1,6 @@
 from pathlib import Path
 import typing
+import functools
 
 from ck2_savefile.info_representation import (
     InfoRepresentation,
@@ -10,14 +11,23 @@ from ck2_savefile.info_representation import (
     MultiKeyValueInfo,
     OptionalKeyDict
     )
+from ck2_savefile.cache import SearchCache
 from ck2_savefile.response import ParseResponse
 
+if typing.TYPE_CHECKING:
+    from ck2_savefile.session import SaveSession
+
 DataGeneratorFuncType = typing.Callable[...,typing.Generator[InfoRepresentation, None , None]]
 
 class SaveFileParser:
     
-    def __init__(self , file_path : Path ):
+    def __init__(self ,
+                 file_path : Path ,
+                 session : 'SaveSession | None' = None ,
+                 cache : SearchCache | None = None):
         self.path = file_path
+        self.session = session
+        self.cache = cache
     @staticmethod
     def read_file_line_by_line(file_path : Path):
         with open(file_path, 'r') as file:
@@ -49,38 +59,59 @@ class SaveFileParser:
                 yield new_value
                 continue
             
-            if OneLineKeyListInfo.corresponds(raw_info = line):
+            # a key={ line also contains '=' and '{', so it must be claimed before OneLineKeyListInfo
+            if OptionalKeyDict.corresponds(raw_info = line):
                 
-                new_value = OneLineKeyListInfo.create(raw_info = line, index= index)
+                new_value = OptionalKeyDict.create(first_line = line,start_index=index , ck2generator = generator)
                 yield new_value
                 continue
             
-            if DictInfo.corresponds(raw_info = line):
+            if OneLineKeyListInfo.corresponds(raw_info = line):
                 
-                new_value = DictInfo.create(raw_key_data = line,start_index=index , ck2generator = generator)
+                new_value = OneLineKeyListInfo.create(raw_info = line, index= index)
                 yield new_value
                 continue
             
-            if OptionalKeyDict.corresponds(raw_info = line):
+            if DictInfo.corresponds(raw_info = line):
                 
-                new_value = OptionalKeyDict.create(raw_key_data = line,start_index=index , ck2generator = generator)
+                new_value = DictInfo.create(raw_key_data = line,start_index=index , ck2generator = generator)
                 yield new_value
                 continue
+    def get_line_generator(self, start_line : int = 0) -> typing.Iterator[tuple[int, str]]:
+        if self.session is not None:
+            return self.session.cursor(start_line = start_line)
+        generator = SaveFileParser.read_file_line_by_line(file_path = self.path)
+        for _ in range(start_line):
+            next(generator)
+        return generator
+    
+    def _parse_and_close(self,
+                         generator : typing.Iterator[tuple[int, str]]
+                         ) -> typing.Generator[InfoRepresentation , None ,None]:
+        try:
+            yield from self._parse_data(generator = generator)
+        finally:
+            generator.close()
+    
     def get_path_generator(self) -> DataGeneratorFuncType:
         def func():
-            generator = SaveFileParser.read_file_line_by_line(file_path = self.path)
-            next(generator)
-            return self._parse_data(generator = generator)
+            generator = self.get_line_generator(start_line = 1)
+            return self._parse_and_close(generator = generator)
         
         return func
             
     def parse_data(self) -> ParseResponse:
-        generator = SaveFileParser.read_file_line_by_line(file_path = self.path)
+        generator = self.get_line_generator()
         first_line = next(generator) 
+        generator.close()
         
         return ParseResponse(
             first_line = first_line,
-            response_generator_func = self.get_path_generator()
+            response_generator_func = self.get_path_generator(),
+            session = self.session,
+            line_generator_func = functools.partial(self.get_line_generator, start_line = 1),
+            file_path = self.path,
+            cache = self.cache
             )
         
         
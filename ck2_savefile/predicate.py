@@ -0,0 +1,117 @@
+import abc
+import typing
+from dataclasses import dataclass
+
+from ck2_savefile.info_representation import InfoRepresentation, OneLineKeyValueInfo, MultiKeyValueInfo
+
+ComparableValue = tuple[float, ...]
+
+
+def normalize_value(value : typing.Any) -> str:
+    """Return a value as written in the save, without the surrounding quotes."""
+    return str(value).strip().strip('"')
+
+def sortable_value(value : typing.Any) -> ComparableValue | None:
+    """
+    Turn a number or a CK2 date into a comparable tuple.
+
+    Dates like "769.8.20" become (769, 8, 20), numbers like "5.000" become (5.0,).
+    Returns None for anything else.
+    """
+    normalized = normalize_value(value)
+    parts = normalized.split('.')
+    try:
+        if len(parts) > 2:
+            return tuple(int(part) for part in parts)
+        return (float(normalized),)
+    except ValueError:
+        return None
+
+def info_pairs(info : InfoRepresentation) -> dict[str, str]:
+    """Collect the direct key=value children of a block, keeping the first value of a repeated key."""
+    pairs : dict[str, str] = {}
+    for value in getattr(info , 'value' , ()):
+        if isinstance(value , OneLineKeyValueInfo):
+            pairs.setdefault(value.data_key, value.data_value)
+        elif isinstance(value , MultiKeyValueInfo):
+            for pair in value.values:
+                pairs.setdefault(pair.data_key, pair.data_value)
+    return pairs
+
+
+class Predicate(abc.ABC):
+    """
+    Declarative condition on the direct key=value children of a block.
+
+    Predicates can be evaluated on the raw lines of a block, before any
+    InfoRepresentation is built, which lets searches discard blocks while the
+    save is tokenized. They are also callable on a built block, so they can be
+    passed anywhere a `search_func` is accepted.
+    """
+
+    @abc.abstractmethod
+    def check(self , pairs : dict[str, str]) -> bool:
+        """Whether the block whose direct key=value children are `pairs` matches."""
+
+    def __call__(self , info : InfoRepresentation) -> bool:
+        return self.check(pairs = info_pairs(info = info))
+
+    def __and__(self , other : 'Predicate') -> 'AllOf':
+        return AllOf(predicates = (self, other))
+
+
+@dataclass(frozen = True)
+class KeyEquals(Predicate):
+    key : str
+    value : typing.Any
+
+    def check(self , pairs : dict[str, str]) -> bool:
+        return self.key in pairs and normalize_value(pairs[self.key]) == normalize_value(self.value)
+
+
+@dataclass(frozen = True)
+class KeyIn(Predicate):
+    key : str
+    values : frozenset[str]
+
+    def __post_init__(self):
+        object.__setattr__(self, 'values', frozenset(normalize_value(value) for value in self.values))
+
+    def check(self , pairs : dict[str, str]) -> bool:
+        return self.key in pairs and normalize_value(pairs[self.key]) in self.values
+
+
+@dataclass(frozen = True)
+class KeyRange(Predicate):
+    """Inclusive numeric or date range on a child key; a missing bound is open."""
+    key : str
+    low : typing.Any = None
+    high : typing.Any = None
+
+    def __post_init__(self):
+        for name in ('low', 'high'):
+            bound = getattr(self , name)
+            sortable_bound = None if bound is None else sortable_value(bound)
+            if bound is not None and sortable_bound is None:
+                raise ValueError(f'KeyRange {name} must be a number or a date, got {bound!r}')
+            object.__setattr__(self, f'_sortable_{name}', sortable_bound)
+
+    def check(self , pairs : dict[str, str]) -> bool:
+        if self.key not in pairs:
+            return False
+        value = sortable_value(pairs[self.key])
+        if value is None:
+            return False
+        if self._sortable_low is not None and value < self._sortable_low:
+            return False
+        if self._sortable_high is not None and value > self._sortable_high:
+            return False
+        return True
+
+
+@dataclass(frozen = True)
+class AllOf(Predicate):
+    predicates : tuple[Predicate, ...]
+
+    def check(self , pairs : dict[str, str]) -> bool:
+        return all(predicate.check(pairs = pairs) for predicate in self.predicates)
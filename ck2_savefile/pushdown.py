@@ -0,0 +1,165 @@
+import typing
+
+from ck2_savefile.info_representation import (
+    InfoRepresentation,
+    DictInfo,
+    OptionalKeyDict,
+    OneLineKeyValueInfo,
+    MultiKeyValueInfo,
+    OneLineListInfo
+    )
+from ck2_savefile.search_type import DictSearch, OptionalKeyDictSearch
+
+LineIterator = typing.Iterator[tuple[int, str]]
+BlockSearchType = DictSearch | OptionalKeyDictSearch
+
+
+def raw_block_type(line : str) -> typing.Type[DictInfo] | typing.Type[OptionalKeyDict] | None:
+    """Classify a line in the same order as SaveFileParser, so both paths see the same blocks."""
+    if OneLineListInfo.corresponds(raw_info = line):
+        return None
+    if DictInfo.corresponds(raw_info = line):
+        return DictInfo
+    if OptionalKeyDict.corresponds(raw_info = line):
+        return OptionalKeyDict
+    return None
+
+def raw_block_key(line : str , block_type : typing.Type[DictInfo] | typing.Type[OptionalKeyDict]) -> str | None:
+    if block_type is DictInfo:
+        return line.replace('\n','').replace('\t','').replace('=','')
+    if '=' in line:
+        return line.split('=')[0].replace('\t','')
+    return None
+
+def _open_block(header : str , lines : LineIterator , block : list[tuple[int, str]] | None = None) -> int:
+    """
+    Return the bracket depth once a block whose header was just read is open.
+
+    The opening bracket line of a DictInfo is consumed, and kept in `block` when
+    given. Raises ValueError like DictInfo.create when that line is missing.
+    """
+    depth = header.count('{') - header.count('}')
+    if depth == 0:
+        index , open_parenthesis = next(lines)
+        if not open_parenthesis.endswith('{\n'):
+            raise ValueError(f'Expected a curly bracket but only got {open_parenthesis}')
+        if block is not None:
+            block.append((index , open_parenthesis))
+        depth = 1
+    return depth
+
+def iter_block_body(header : str , lines : LineIterator) -> typing.Generator[tuple[int, str], None, None]:
+    """
+    Yield every line inside a block whose header was just read, nested lines included.
+
+    The opening bracket line of a DictInfo is consumed silently and the generator
+    stops after consuming the closing bracket, leaving `lines` on the next entry.
+    """
+    depth = _open_block(header = header , lines = lines)
+    for index , line in lines:
+        depth += line.count('{') - line.count('}')
+        if depth <= 0:
+            return
+        yield index , line
+
+def collect_block(header : tuple[int, str] , lines : LineIterator) -> list[tuple[int, str]]:
+    """Return the raw lines of a block, from its header to its closing bracket."""
+    block = [header]
+    depth = _open_block(header = header[1] , lines = lines , block = block)
+    for index , line in lines:
+        block.append((index , line))
+        depth += line.count('{') - line.count('}')
+        if depth <= 0:
+            break
+    return block
+
+def skip_block(header : tuple[int, str] , lines : LineIterator) -> None:
+    """Consume the raw lines of a block without keeping them."""
+    depth = _open_block(header = header[1] , lines = lines)
+    for _ , line in lines:
+        depth += line.count('{') - line.count('}')
+        if depth <= 0:
+            return
+
+def block_pairs(block : list[tuple[int, str]]) -> dict[str, str]:
+    """Collect the direct key=value children of a collected block without building it."""
+    pairs : dict[str, str] = {}
+    depth = 0
+    for _ , line in block:
+        if depth == 1:
+            if OneLineKeyValueInfo.corresponds(raw_info = line):
+                key , value = line.replace('\t','').replace('\n','').split('=')
+                pairs.setdefault(key, value)
+            elif MultiKeyValueInfo.corresponds(raw_info = line):
+                for pair in line.replace('\t','').replace('\n','').split(' '):
+                    if '=' in pair:
+                        key , _ , value = pair.partition('=')
+                        pairs.setdefault(key, value)
+        depth += line.count('{') - line.count('}')
+    return pairs
+
+def create_block(header : tuple[int, str] ,
+                 block_type : typing.Type[DictInfo] | typing.Type[OptionalKeyDict] ,
+                 lines : LineIterator
+                 ) -> DictInfo | OptionalKeyDict:
+    index , line = header
+    if block_type is DictInfo:
+        return DictInfo.create(raw_key_data = line , start_index = index , ck2generator = lines)
+    return OptionalKeyDict.create(first_line = line , start_index = index , ck2generator = lines)
+
+def supports_push_down(term : typing.Any) -> bool:
+    return isinstance(term , (DictSearch , OptionalKeyDictSearch)) and term.can_push_down()
+
+def push_down_search(lines : LineIterator ,
+                     terms : typing.Sequence[BlockSearchType]
+                     ) -> typing.Generator[InfoRepresentation, None, bool]:
+    """
+    Run a chain of block searches directly on raw lines.
+
+    Blocks whose key or predicate does not match are skipped by counting brackets,
+    without building any InfoRepresentation. Matching blocks are descended into
+    line by line for the following term, and only blocks matched by the last term
+    are built. Returns True once a term without `multiple_values_flag` found its
+    match, so the whole chain stops like the regular search does.
+    """
+    term = terms[0]
+    remaining_terms = terms[1:]
+
+    for index , line in lines:
+        block_type = raw_block_type(line = line)
+        if block_type is None:
+            continue
+
+        header = (index , line)
+        if block_type is not term.item_info_type:
+            skip_block(header = header , lines = lines)
+            continue
+
+        key = raw_block_key(line = line , block_type = block_type)
+        if term.uses_predicate():
+            block = collect_block(header = header , lines = lines)
+            if not term.check_raw_block(key = key , pairs = block_pairs(block = block)):
+                continue
+            block_lines = iter(block[1:])
+        else:
+            if not term.check_raw_block(key = key , pairs = None):
+                skip_block(header = header , lines = lines)
+                continue
+            block_lines = lines
+
+        if remaining_terms:
+            body = iter_block_body(header = line , lines = block_lines)
+            stopped = yield from push_down_search(lines = body , terms = remaining_terms)
+            if stopped:
+                return True
+            for _ in body:
+                pass
+        else:
+            data_generator , _ = term.get_values(info = create_block(header = header ,
+                                                                      block_type = block_type ,
+                                                                      lines = block_lines))
+            yield from data_generator
+
+        if not term.multiple_values_flag:
+            return True
+    return False
@@ -1,14 +1,35 @@
 import typing
-from ck2_savefile.info_representation import InfoRepresentation
+import itertools
+from pathlib import Path
+from ck2_savefile.cache import SearchCache
+from ck2_savefile.info_representation import InfoRepresentation, DictInfo, OptionalKeyDict
+from ck2_savefile.index import BlockSpan, BlockSpanIndex
+from ck2_savefile.pushdown import push_down_search, supports_push_down
 from ck2_savefile.search_type import DictSearch, OneLineKeyValueSearch , OptionalKeyDictSearch
 
 DataGeneratorFuncType = typing.Callable[..., typing.Generator[InfoRepresentation, None, None]]
+LineGeneratorFuncType = typing.Callable[[], typing.Iterator[tuple[int, str]]]
 SearchType = DictSearch | OneLineKeyValueSearch | OptionalKeyDictSearch
 
+if typing.TYPE_CHECKING:
+    from ck2_savefile.session import SaveSession
+
+def close_data(data: typing.Iterable | None) -> None:
+    """Close a generator, and with it the file or cursor it reads, once its data is no longer needed."""
+    close = getattr(data, 'close', None)
+    if close is not None:
+        close()
+
 class ParseResponse:
-    def __init__(self, first_line: str, response_generator_func: DataGeneratorFuncType | typing.Generator):
+    def __init__(self, first_line: str, response_generator_func: DataGeneratorFuncType | typing.Generator,
+                 session: 'SaveSession | None' = None, line_generator_func: LineGeneratorFuncType | None = None,
+                 file_path: Path | None = None, cache: SearchCache | None = None):
         self.first_line = first_line
         self.response_generator_func = response_generator_func
+        self.session = session
+        self.line_generator_func = line_generator_func
+        self.file_path = file_path
+        self.cache = cache
 
     @property
     def generator(self) -> typing.Generator[InfoRepresentation, None, None]:
@@ -22,29 +43,35 @@ class ParseResponse:
         if current_data is None:
             current_data = self.generator
         
-        for info in current_data:
-            if term.check_if_valid(info = info):
-                data_generator,multiple_values_flag  = term.get_values(info = info)
-                
-                yield from data_generator
-                
-                if not multiple_values_flag:
-                    return
+        try:
+            for info in current_data:
+                if term.check_if_valid(info = info):
+                    data_generator,multiple_values_flag  = term.get_values(info = info)
+                    
+                    yield from data_generator
+                    
+                    if not multiple_values_flag:
+                        return
+        finally:
+            close_data(current_data)
     def _unravel_dict_generator(self, current_data: typing.Generator[InfoRepresentation, None, None]
                                ) -> typing.Generator[InfoRepresentation, None, None]:
         """Unravel nested dictionary-like structures."""
-        for data in current_data:
-            
-            if isinstance(data , DictSearch.item_info_type):
-                data : DictSearch.item_info_type
-                for value in data.value:
-                    yield value
-            elif isinstance(data, OptionalKeyDictSearch.item_info_type):
-                data : OneLineKeyValueSearch.item_info_type
-                for value in data.value:
-                    yield value
-            else:
-                raise Exception(f'Encountered wrong type of data while unraveling! : {type(data)}')
+        try:
+            for data in current_data:
+                
+                if isinstance(data , DictSearch.item_info_type):
+                    data : DictSearch.item_info_type
+                    for value in data.value:
+                        yield value
+                elif isinstance(data, OptionalKeyDictSearch.item_info_type):
+                    data : OneLineKeyValueSearch.item_info_type
+                    for value in data.value:
+                        yield value
+                else:
+                    raise Exception(f'Encountered wrong type of data while unraveling! : {type(data)}')
+        finally:
+            close_data(current_data)
     def unravel_dict_generator(self, current_data: typing.Generator[InfoRepresentation, None, None] | None, unravel_flag: bool
                               ) -> typing.Generator[InfoRepresentation, None, None]:
         """Conditionally unravel nested dictionary-like structures."""
@@ -54,23 +81,146 @@ class ParseResponse:
             return current_data
         return self._unravel_dict_generator(current_data=current_data)
 
-    def get_by_search_term(self, *args: OneLineKeyValueSearch) -> typing.Self:
-        """Chain multiple searches and refine results iteratively."""
+    def _count_push_down_terms(self, terms: typing.Sequence[SearchType]) -> int:
+        if self.line_generator_func is None or not callable(self.response_generator_func):
+            return 0
+        count = 0
+        for term in terms:
+            if not supports_push_down(term):
+                break
+            count += 1
+        return count
+
+    def _push_down_generator(self, terms: typing.Sequence[SearchType]) -> typing.Generator[InfoRepresentation, None, None]:
+        lines = self.line_generator_func()
+        try:
+            yield from push_down_search(lines=lines, terms=terms)
+        finally:
+            close_data(lines)
+
+    def _search_chain(self, terms: typing.Sequence[SearchType]) -> typing.Generator[InfoRepresentation, None, None]:
         current_data = None
         unravel_flag = False
 
-        for search in args:
+        pushed_down = self._count_push_down_terms(terms)
+        if pushed_down:
+            current_data = self._push_down_generator(terms=terms[:pushed_down])
+            unravel_flag = not terms[pushed_down - 1].get_value_flag
+            terms = terms[pushed_down:]
+
+        for search in terms:
             
             current_data = self.unravel_dict_generator(current_data=current_data, unravel_flag=unravel_flag)
             current_data = self.search_by_term(term=search, current_data=current_data)
             unravel_flag = not search.get_value_flag if (isinstance(search, DictSearch) or
                                                      isinstance(search , OptionalKeyDictSearch)) else False
+        return current_data
+
+    def _uses_cache(self, terms: tuple) -> bool:
+        if self.cache is None or self.file_path is None or not callable(self.response_generator_func):
+            return False
+        try:
+            hash(terms)
+        except TypeError:
+            return False
+        return True
+
+    @staticmethod
+    def _page(data: typing.Iterable[InfoRepresentation], limit: int | None, offset: int,
+              take_while: typing.Callable[[InfoRepresentation], bool] | None
+              ) -> typing.Generator[InfoRepresentation, None, None]:
+        """Skip `offset` results, then stop at `limit` results or at the first one failing `take_while`."""
+        paged_data = data if take_while is None else itertools.takewhile(take_while, data)
+        try:
+            yield from itertools.islice(paged_data, offset, None if limit is None else offset + limit)
+        finally:
+            close_data(data)
+
+    def get_by_search_term(self, *args: OneLineKeyValueSearch, limit: int | None = None, offset: int = 0,
+                           take_while: typing.Callable[[InfoRepresentation], bool] | None = None) -> typing.Self:
+        """Chain multiple searches and refine results iteratively.
+
+        Leading DictSearch/OptionalKeyDictSearch terms that only use a key or a Predicate
+        are run on the raw lines, so blocks they reject are never built. When a `cache`
+        was given for a whole save, fully consumed results are kept in it and reused
+        until the file changes; chains with an unhashable search_func are not cached.
+        Cached objects are shared by every caller, so treat them as read-only.
+
+        `offset`, `limit` and `take_while` page through the results; once the page is
+        complete, every generator of the chain and the file it reads are closed, so only
+        the part of the save the page needs is read.
+        """
+        if self._uses_cache(terms=args):
+            cached_values = self.cache.get(file_path=self.file_path, chain=args)
+            if cached_values is not None:
+                current_data = iter(cached_values)
+            else:
+                current_data = self.cache.recording(file_path=self.file_path, chain=args,
+                                                    data=self._search_chain(terms=args))
+        else:
+            current_data = self._search_chain(terms=args)
+
+        if limit is not None or offset or take_while is not None:
+            current_data = self._page(data=current_data, limit=limit, offset=offset, take_while=take_while)
 
         return ParseResponse(
             first_line=self.first_line,
-            response_generator_func=current_data
+            response_generator_func=current_data,
+            session=self.session,
+            file_path=self.file_path,
+            cache=self.cache
         )
 
+    def _get_session(self) -> 'SaveSession':
+        if self.session is None or self.session.closed:
+            raise ValueError('Random access requires a response created from an open SaveSession.')
+        return self.session
+
+    @property
+    def block_index(self) -> BlockSpanIndex:
+        """Return the block span index of the save, building it on first use."""
+        session = self._get_session()
+        block_index = session.indexes.get('block_spans')
+        if block_index is None:
+            block_index = BlockSpanIndex.create(line_generator=session.cursor())
+            session.indexes['block_spans'] = block_index
+        return block_index
+
+    def _create_block(self, span: BlockSpan) -> DictInfo | OptionalKeyDict:
+        cursor = self._get_session().cursor(start_line=span.start_index)
+        try:
+            index, line = next(cursor)
+            if span.block_type is DictInfo:
+                return DictInfo.create(raw_key_data=line, start_index=index, ck2generator=cursor)
+            return OptionalKeyDict.create(first_line=line, start_index=index, ck2generator=cursor)
+        finally:
+            cursor.close()
+
+    def node_at_line(self, line_index: int) -> DictInfo | OptionalKeyDict | None:
+        """Return the innermost block enclosing the given line, or None for top level lines."""
+        span = self.block_index.enclosing(line_index=line_index)
+        if span is None:
+            return None
+        return self._create_block(span=span)
+
+    def node_at_path(self, key_path: str | typing.Sequence[str]) -> DictInfo | OptionalKeyDict | None:
+        """Return the first block found at a key path such as 'title/k_france'."""
+        span = self.block_index.resolve(key_path=key_path)
+        if span is None:
+            return None
+        return self._create_block(span=span)
+
+    def close(self) -> None:
+        """Stop a search response early, closing its generators and the file they read."""
+        if not callable(self.response_generator_func):
+            close_data(self.response_generator_func)
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def __iter__(self ) :
         if callable(self.response_generator_func):
             raise Exception('Do not try to parse the whole file please!')
@@ -1,5 +1,6 @@
 import typing
 from ck2_savefile.info_representation import InfoRepresentation ,DictInfo, OneLineKeyValueInfo, OptionalKeyDict
+from ck2_savefile.predicate import Predicate
 
 class DictSearch:
     """
@@ -29,6 +30,8 @@ class DictSearch:
 
         Args:
             search_key (str): The key to search for within the dictionary structures.
+            search_func (typing.Callable, optional): Used when no search_key is given. A Predicate is also
+                evaluated on the raw lines of each block, before the block is built.
             get_value_flag (bool, optional): Flag indicating whether to retrieve values associated with the key. Defaults to True.
             multiple_values_flag (bool, optional): Flag indicating whether to allow multiple values for the same key. Defaults to False.
         """
@@ -39,7 +42,7 @@ class DictSearch:
     
     def check_if_valid(self , info : InfoRepresentation) -> bool:
         
-        if self.search_key is None and self.search_key is None:
+        if self.search_key is None and self.search_func is None:
             raise ValueError('Expected at least one type of criteria for sort')
         
         if not isinstance(info , self.item_info_type):
@@ -50,6 +53,18 @@ class DictSearch:
         
         return self.search_key == info.key
     
+    def can_push_down(self) -> bool:
+        """Whether the search can be checked on raw lines, before the block is built."""
+        return self.search_key is not None or isinstance(self.search_func , Predicate)
+    
+    def uses_predicate(self) -> bool:
+        return self.search_key is None
+    
+    def check_raw_block(self , key : str , pairs : dict[str, str] | None) -> bool:
+        if self.search_key is None:
+            return self.search_func.check(pairs = pairs)
+        return self.search_key == key
+    
     def _get_values(self , info : DictInfo) -> typing.Generator[InfoRepresentation , None , None]:
         if self.get_value_flag:
             yield from (x for x in info.value)
@@ -62,6 +77,16 @@ class DictSearch:
             self._get_values(info = info),
             self.multiple_values_flag
         )
+    
+    def _identity(self) -> tuple:
+        return (type(self), self.search_key, self.search_func, self.get_value_flag, self.multiple_values_flag)
+    
+    def __eq__(self , other : typing.Any) -> bool:
+        return isinstance(other , type(self)) and self._identity() == other._identity()
+    
+    def __hash__(self) -> int:
+        return hash(self._identity())
+
         
 
 class OptionalKeyDictSearch:
@@ -92,6 +117,8 @@ class OptionalKeyDictSearch:
 
         Args:
             search_key (str, optional): The optional key to search for within the optional dictionary structures.
+            search_func (typing.Callable, optional): Takes priority over search_key. A Predicate is also
+                evaluated on the raw lines of each block, before the block is built.
             get_value_flag (bool, optional): Flag indicating whether to retrieve values associated with the key. Defaults to True.
             multiple_values_flag (bool, optional): Flag indicating whether to allow multiple values for the same key. Defaults to False.
         """
@@ -109,6 +136,18 @@ class OptionalKeyDictSearch:
         
         return self.search_key is None or self.search_key == info.key
     
+    def can_push_down(self) -> bool:
+        """Whether the search can be checked on raw lines, before the block is built."""
+        return self.search_func is None or isinstance(self.search_func , Predicate)
+    
+    def uses_predicate(self) -> bool:
+        return self.search_func is not None
+    
+    def check_raw_block(self , key : str | None , pairs : dict[str, str] | None) -> bool:
+        if self.search_func is not None:
+            return self.search_func.check(pairs = pairs)
+        return self.search_key is None or self.search_key == key
+    
     def _get_values(self , info : OptionalKeyDict) -> typing.Generator[InfoRepresentation , None , None]:
         if self.get_value_flag:
             yield from info.value
@@ -121,6 +160,16 @@ class OptionalKeyDictSearch:
             self._get_values(info = info),
             self.multiple_values_flag
         )
+    
+    def _identity(self) -> tuple:
+        return (type(self), self.search_key, self.search_func, self.get_value_flag, self.multiple_values_flag)
+    
+    def __eq__(self , other : typing.Any) -> bool:
+        return isinstance(other , type(self)) and self._identity() == other._identity()
+    
+    def __hash__(self) -> int:
+        return hash(self._identity())
+
             
             
         
@@ -158,7 +207,7 @@ class OneLineKeyValueSearch:
     
     def check_if_valid(self , info : InfoRepresentation) -> bool:
         
-        if self.search_key is None and self.search_key is None:
+        if self.search_key is None and self.search_func is None:
             raise ValueError('Expected at least one type of criteria for sort')
         
         if not isinstance(info, self.item_info_type):
@@ -177,4 +226,13 @@ class OneLineKeyValueSearch:
         return (
             self._get_values(info = info),
             self.multiple_values_flag
-        )
\ No newline at end of file
+        )
+    
+    def _identity(self) -> tuple:
+        return (type(self), self.search_key, self.search_func, self.multiple_values_flag)
+    
+    def __eq__(self , other : typing.Any) -> bool:
+        return isinstance(other , type(self)) and self._identity() == other._identity()
+    
+    def __hash__(self) -> int:
+        return hash(self._identity())
@@ -0,0 +1,219 @@
+import typing
+import io
+import locale
+
+from ck2_savefile.info_representation import (
+    InfoRepresentation,
+    OneLineKeyValueInfo,
+    MultiKeyValueInfo,
+    OneLineListInfo,
+    OneLineKeyListInfo,
+    DictInfo,
+    OptionalKeyDict,
+    ComplexChanges
+    )
+
+if typing.TYPE_CHECKING:
+    from ck2_savefile.response import ParseResponse
+
+SAVE_FILE_END = '}\n'
+
+class _RepeatedPrefixes(dict):
+    """Cache of a character repeated n times, filled on first use of each n."""
+
+    def __init__(self, character : str):
+        super().__init__()
+        self.character = character
+
+    def __missing__(self, count : int) -> str:
+        value = self[count] = self.character * count
+        return value
+
+_INDENTS = _RepeatedPrefixes('\t')
+_NEWLINES = _RepeatedPrefixes('\n')
+
+AppendFuncType = typing.Callable[[str], None]
+
+
+class SaveFileSerializer:
+    """
+    Writes InfoRepresentation trees into a binary sink.
+
+    Every line is formatted once using cached indentation prefixes, and
+    lines are gathered into batches that are encoded and written in a single
+    call, instead of concatenating each line piece by piece. Top level blocks
+    are rendered child by child, so the text of a huge section is written in
+    batches instead of being joined into one string; the nodes themselves are
+    already built when they are passed to `write`.
+    The output is identical to joining the nodes' `to_raw_string` results.
+
+    Args:
+        sink (typing.BinaryIO): The binary stream receiving the serialized data.
+        encoding (str, optional): Encoding of the written text. Defaults to the
+            locale encoding, like `open` does.
+        batch_size (int, optional): Number of lines gathered before each write. Defaults to 65536.
+        newline (str, optional): Line ending written for every line, like the `newline`
+            argument of `open`. Pass '\r\n' to keep the endings of a CRLF save. Defaults to '\n'.
+    """
+
+    def __init__(self,
+                 sink : typing.BinaryIO,
+                 encoding : str | None = None,
+                 batch_size : int = 1 << 16,
+                 newline : str = '\n'
+                 ):
+        self.sink = sink
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.batch_size = batch_size
+        self.newline = newline
+        self._fragments : list[str] = []
+
+    def flush(self) -> None:
+        if self._fragments:
+            text = ''.join(self._fragments)
+            if self.newline != '\n':
+                text = text.replace('\n', self.newline)
+            self.sink.write(text.encode(self.encoding))
+            self._fragments.clear()
+
+    def _flush_full_batch(self) -> None:
+        if len(self._fragments) >= self.batch_size:
+            self.flush()
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+    def write_line(self, line : str) -> None:
+        self._fragments.append(line)
+        self._flush_full_batch()
+
+    def _write_children(self, values : list[InfoRepresentation]) -> None:
+        append = self._fragments.append
+        for value in values:
+            render_node(node = value, append = append)
+            self._flush_full_batch()
+
+    def write(self, node : InfoRepresentation) -> None:
+        append = self._fragments.append
+        if isinstance(node , DictInfo):
+            _render_dict_open(node = node, append = append)
+            self._write_children(values = node.value)
+            _render_dict_close(node = node, append = append)
+        elif isinstance(node , OptionalKeyDict):
+            _render_optional_key_dict_open(node = node, append = append)
+            self._write_children(values = node.value)
+            _render_optional_key_dict_close(node = node, append = append)
+        else:
+            render_node(node = node, append = append)
+        self._flush_full_batch()
+
+    def write_all(self, nodes : typing.Iterable[InfoRepresentation]) -> None:
+        for node in nodes:
+            self.write(node)
+
+    def dump(self, response : 'ParseResponse') -> None:
+        """Write a whole save: its first line, every top level node and the closing bracket."""
+        _, first_line = response.first_line
+        self.write_line(first_line)
+        self.write_all(response.generator)
+        self.write_line(SAVE_FILE_END)
+        self.flush()
+
+    @staticmethod
+    def iter_lines(node : InfoRepresentation) -> typing.Generator[str, None, None]:
+        """Yield the node one line at a time, as EditorHandler expects for insertions."""
+        fragments : list[str] = []
+        render_node(node = node, append = fragments.append)
+        text = ''.join(fragments)
+        # split on '\n' only, str.splitlines would also split on characters allowed inside values
+        start = 0
+        while start < len(text):
+            end = text.find('\n', start) + 1 or len(text)
+            yield text[start:end]
+            start = end
+
+    @staticmethod
+    def complex_change(node : InfoRepresentation, insertion_index : int) -> ComplexChanges:
+        """Build the insertion of a node, rendered right away so later edits to the node do not leak into it."""
+        return ComplexChanges(
+            insertion_index = insertion_index,
+            insertion_generator = list(SaveFileSerializer.iter_lines(node = node))
+        )
+
+    @staticmethod
+    def to_bytes(node : InfoRepresentation, encoding : str | None = None) -> bytes:
+        sink = io.BytesIO()
+        with SaveFileSerializer(sink = sink, encoding = encoding) as serializer:
+            serializer.write(node)
+        return sink.getvalue()
+
+
+def _render_one_line_key_value(node : OneLineKeyValueInfo, append : AppendFuncType) -> None:
+    append(f'{_INDENTS[node.start_spaces]}{node.data_key}={node.data_value}{_NEWLINES[node.end_spaces]}')
+
+def _render_multi_key_value(node : MultiKeyValueInfo, append : AppendFuncType) -> None:
+    pairs = ' '.join([f'{_INDENTS[value.start_spaces]}{value.data_key}={value.data_value}{_NEWLINES[value.end_spaces]}'
+                      for value in node.values])
+    append(f'{_INDENTS[node.start_space]}{pairs}{_NEWLINES[node.end_spaces]}')
+
+def _render_one_line_list(node : OneLineListInfo, append : AppendFuncType) -> None:
+    append(f'{_INDENTS[node.start_spaces]}{" ".join(node.tokens())}{_NEWLINES[node.end_spaces]}')
+
+def _render_one_line_key_list(node : OneLineKeyListInfo, append : AppendFuncType) -> None:
+    data_list = node.data_list
+    append(f'{_INDENTS[node.start_spaces]}{node.data_key}='
+           f'{"{" * data_list.start_spaces}{" ".join(data_list.tokens())}{"}" * data_list.end_spaces}'
+           f'{_NEWLINES[node.end_spaces]}')
+
+def _render_children(values : list[InfoRepresentation], append : AppendFuncType) -> None:
+    renderers = _RENDERERS
+    for value in values:
+        renderer = renderers.get(type(value))
+        if renderer is None:
+            raise TypeError(f'Cannot serialize data of type {type(value)}')
+        renderer(value, append)
+
+def _render_dict_open(node : DictInfo, append : AppendFuncType) -> None:
+    indent = _INDENTS[node.start_spaces]
+    newlines = _NEWLINES[node.end_spaces]
+    append(f'{indent}{node.key}={newlines}')
+    append(f'{indent}{{{newlines}')
+
+def _render_dict_close(node : DictInfo, append : AppendFuncType) -> None:
+    append(f'{_INDENTS[node.start_spaces]}}}{_NEWLINES[node.end_spaces]}')
+
+def _render_dict(node : DictInfo, append : AppendFuncType) -> None:
+    _render_dict_open(node = node, append = append)
+    _render_children(values = node.value, append = append)
+    _render_dict_close(node = node, append = append)
+
+def _render_optional_key_dict_open(node : OptionalKeyDict, append : AppendFuncType) -> None:
+    key = '' if node.key is None else f'{node.key}='
+    append(f'{_INDENTS[node.first_line_start]}{key}{{\n')
+
+def _render_optional_key_dict_close(node : OptionalKeyDict, append : AppendFuncType) -> None:
+    append(f'{_INDENTS[node.last_line_start]}}}\n')
+
+def _render_optional_key_dict(node : OptionalKeyDict, append : AppendFuncType) -> None:
+    _render_optional_key_dict_open(node = node, append = append)
+    _render_children(values = node.value, append = append)
+    _render_optional_key_dict_close(node = node, append = append)
+
+_RENDERERS : dict[type, typing.Callable[[typing.Any, AppendFuncType], None]] = {
+    OneLineKeyValueInfo : _render_one_line_key_value,
+    MultiKeyValueInfo : _render_multi_key_value,
+    OneLineListInfo : _render_one_line_list,
+    OneLineKeyListInfo : _render_one_line_key_list,
+    DictInfo : _render_dict,
+    OptionalKeyDict : _render_optional_key_dict,
+}
+
+def render_node(node : InfoRepresentation, append : AppendFuncType) -> None:
+    """Render a node as line fragments passed to `append`."""
+    renderer = _RENDERERS.get(type(node))
+    if renderer is None:
+        raise TypeError(f'Cannot serialize data of type {type(node)}')
+    renderer(node, append)
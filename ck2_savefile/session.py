@@ -0,0 +1,160 @@
+from pathlib import Path
+import typing
+import io
+import locale
+import mmap
+from array import array
+
+from ck2_savefile.parser import SaveFileParser
+from ck2_savefile.response import ParseResponse
+
+LINE_OFFSET_STRIDE = 64
+CURSOR_CHUNK_SIZE = 1 << 20
+
+
+SaveCursor = typing.Generator[tuple[int, str], None, None]
+
+
+class SaveSession:
+    """
+    Owns a single open handle and memory map of a save file for its whole lifetime.
+
+    The session lazily builds a sparse line-to-byte offset table and keeps any
+    other index built over the file in `indexes`, so repeated queries reuse the
+    same I/O state instead of reopening and rescanning the save. Use it as a
+    context manager to release the file deterministically.
+
+    Args:
+        file_path (Path): Path to the save file.
+        encoding (str, optional): Text encoding of the save. Defaults to the same
+            locale encoding `open` would use.
+    """
+
+    def __init__(self, file_path : Path, encoding : str | None = None):
+        self.path = Path(file_path)
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.indexes : dict[str, typing.Any] = {}
+        self._file : typing.BinaryIO | None = None
+        self._mmap : mmap.mmap | None = None
+        self._line_offsets : array | None = None
+        self._line_count : int | None = None
+
+    def open(self) -> typing.Self:
+        if self._mmap is not None:
+            return self
+        self._file = self.path.open('rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            self._file = None
+            raise ValueError(f'Cannot open an empty save file : {self.path}')
+        return self
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._line_offsets = None
+        self._line_count = None
+        self.indexes.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap is None
+
+    def __enter__(self) -> typing.Self:
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def mmap(self) -> mmap.mmap:
+        if self._mmap is None:
+            raise ValueError('The save session is closed.')
+        return self._mmap
+
+    def _build_line_offsets(self) -> None:
+        data = self.mmap
+        offsets = array('Q')
+        size = len(data)
+        position = 0
+        line_index = 0
+        while position < size:
+            if line_index % LINE_OFFSET_STRIDE == 0:
+                offsets.append(position)
+            end = data.find(b'\n', position)
+            position = size if end == -1 else end + 1
+            line_index += 1
+        self._line_offsets = offsets
+        self._line_count = line_index
+
+    @property
+    def line_count(self) -> int:
+        if self._line_count is None:
+            self._build_line_offsets()
+        return self._line_count
+
+    def line_offset(self, line_index : int) -> int:
+        """Return the byte offset at which the given line starts."""
+        if line_index < 0:
+            raise IndexError(f'Line {line_index} is outside of the save file.')
+        if line_index == 0:
+            return 0
+        if self._line_offsets is None and line_index < LINE_OFFSET_STRIDE:
+            data = self.mmap
+            position = 0
+            for current_line in range(line_index):
+                end = data.find(b'\n', position)
+                if end == -1:
+                    # only a last line without a newline may still end at the end of the file
+                    if current_line == line_index - 1 and position < len(data):
+                        return len(data)
+                    raise IndexError(f'Line {line_index} is outside of the save file.')
+                position = end + 1
+            return position
+        if self._line_offsets is None:
+            self._build_line_offsets()
+        if line_index > self._line_count:
+            raise IndexError(f'Line {line_index} is outside of the save file.')
+        if line_index == self._line_count:
+            return len(self.mmap)
+        checkpoint, remaining = divmod(line_index, LINE_OFFSET_STRIDE)
+        data = self.mmap
+        position = self._line_offsets[checkpoint]
+        for _ in range(remaining):
+            position = data.find(b'\n', position) + 1
+        return position
+
+    def cursor(self, start_line : int = 0) -> SaveCursor:
+        """
+        Return a forward-only reader yielding (index, line) pairs from `start_line` on.
+
+        Every cursor keeps its own byte position, so any number of cursors can walk
+        the session at once. The map is decoded a chunk at a time, with the same
+        newline handling as reading the file in text mode.
+        """
+        position = self.line_offset(start_line)
+        data = self.mmap
+        size = len(data)
+        index = start_line
+        while position < size:
+            chunk_end = position + CURSOR_CHUNK_SIZE
+            if chunk_end >= size:
+                end = size
+            else:
+                end = data.rfind(b'\n', position, chunk_end) + 1 or data.find(b'\n', chunk_end) + 1 or size
+            for line in io.StringIO(data[position:end].decode(self.encoding), newline = None):
+                yield index , line
+                index += 1
+            position = end
+
+    def read_line(self, line_index : int) -> str:
+        return next(self.cursor(start_line = line_index))[1]
+
+    def parse_data(self) -> ParseResponse:
+        return SaveFileParser(file_path = self.path, session = self).parse_data()
@@ -0,0 +1,275 @@
+from pathlib import Path
+import typing
+import sqlite3
+
+from ck2_savefile.info_representation import (
+    InfoRepresentation,
+    OneLineKeyValueInfo,
+    MultiKeyValueInfo,
+    OneLineListInfo,
+    OneLineKeyListInfo,
+    DictInfo,
+    OptionalKeyDict
+    )
+from ck2_savefile.predicate import info_pairs, normalize_value, sortable_value
+from ck2_savefile.response import ParseResponse
+from ck2_savefile.search_type import OneLineKeyValueSearch
+from ck2_savefile.session import SaveSession
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    save_id INTEGER PRIMARY KEY,
+    save_date TEXT NOT NULL UNIQUE,
+    save_date_order INTEGER,
+    version TEXT,
+    path TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    save_id INTEGER NOT NULL,
+    node_id INTEGER NOT NULL,
+    parent_id INTEGER,
+    key TEXT,
+    value TEXT,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    PRIMARY KEY (save_id, node_id)
+);
+CREATE INDEX IF NOT EXISTS nodes_key ON nodes (save_id, key);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (save_id, parent_id);
+CREATE TABLE IF NOT EXISTS characters (
+    save_id INTEGER NOT NULL,
+    character_id TEXT NOT NULL,
+    birth_name TEXT,
+    dynasty_id TEXT,
+    birth_date TEXT,
+    death_date TEXT,
+    father_id TEXT,
+    mother_id TEXT,
+    religion TEXT,
+    culture TEXT,
+    node_id INTEGER,
+    PRIMARY KEY (save_id, character_id)
+);
+CREATE INDEX IF NOT EXISTS characters_dynasty ON characters (dynasty_id, save_id);
+CREATE TABLE IF NOT EXISTS dynasties (
+    save_id INTEGER NOT NULL,
+    dynasty_id TEXT NOT NULL,
+    name TEXT,
+    culture TEXT,
+    religion TEXT,
+    node_id INTEGER,
+    PRIMARY KEY (save_id, dynasty_id)
+);
+CREATE TABLE IF NOT EXISTS titles (
+    save_id INTEGER NOT NULL,
+    title_key TEXT NOT NULL,
+    holder_id TEXT,
+    liege TEXT,
+    node_id INTEGER,
+    PRIMARY KEY (save_id, title_key)
+);
+CREATE INDEX IF NOT EXISTS titles_holder ON titles (holder_id, save_id);
+CREATE TABLE IF NOT EXISTS provinces (
+    save_id INTEGER NOT NULL,
+    province_id TEXT NOT NULL,
+    name TEXT,
+    culture TEXT,
+    religion TEXT,
+    node_id INTEGER,
+    PRIMARY KEY (save_id, province_id)
+);
+CREATE TABLE IF NOT EXISTS wars (
+    save_id INTEGER NOT NULL,
+    node_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    name TEXT,
+    attacker_id TEXT,
+    defender_id TEXT,
+    PRIMARY KEY (save_id, node_id)
+);
+CREATE INDEX IF NOT EXISTS wars_attacker ON wars (attacker_id, save_id);
+CREATE INDEX IF NOT EXISTS wars_defender ON wars (defender_id, save_id);
+"""
+
+SAVE_TABLES = ('nodes', 'characters', 'dynasties', 'titles', 'provinces', 'wars')
+
+# section key -> (table, columns filled from the child's key=value pairs, with the save key of each column)
+SECTION_TABLES : dict[str, tuple[str, tuple[tuple[str, str], ...]]] = {
+    'character' : ('characters', (('birth_name', 'bn'), ('dynasty_id', 'dnt'), ('birth_date', 'b_d'),
+                                  ('death_date', 'd_d'), ('father_id', 'fat'), ('mother_id', 'mot'),
+                                  ('religion', 'rel'), ('culture', 'cul'))),
+    'dynasties' : ('dynasties', (('name', 'name'), ('culture', 'culture'), ('religion', 'religion'))),
+    'title' : ('titles', (('holder_id', 'holder'), ('liege', 'liege'))),
+    'provinces' : ('provinces', (('name', 'name'), ('culture', 'culture'), ('religion', 'religion'))),
+}
+WAR_KEYS = {'active_war' : 'active', 'previous_war' : 'previous'}
+WAR_COLUMNS = (('name', 'name'), ('attacker_id', 'attacker'), ('defender_id', 'defender'))
+
+
+def _optional_value(pairs : dict[str, str] , key : str) -> str | None:
+    return normalize_value(pairs[key]) if key in pairs else None
+
+def _node_row(info : InfoRepresentation) -> tuple[str | None, str | None, int, int]:
+    """Return the key, value and line span stored for a node."""
+    if isinstance(info , OneLineKeyValueInfo):
+        return info.data_key, info.data_value, info.index, info.index
+    if isinstance(info , OneLineKeyListInfo):
+        return info.data_key, ' '.join(info.data_list.tokens()), info.index, info.index
+    if isinstance(info , OneLineListInfo):
+        return None, ' '.join(info.tokens()), info.index, info.index
+    if isinstance(info , MultiKeyValueInfo):
+        return None, None, info.index, info.index
+    if isinstance(info , (DictInfo , OptionalKeyDict)):
+        return info.key, None, info.start_index, info.end_index
+    raise TypeError(f'Cannot store data of type {type(info)}')
+
+def _children(info : InfoRepresentation) -> list[InfoRepresentation]:
+    if isinstance(info , MultiKeyValueInfo):
+        return info.values
+    if isinstance(info , (DictInfo , OptionalKeyDict)):
+        return info.value
+    return []
+
+
+class SaveStore:
+    """
+    SQLite store holding any number of exported saves, keyed by their in-game date.
+
+    Every node of a save goes to the generic `nodes` table (id, parent, key, value,
+    line span) and the entries of the character, dynasties, title and provinces
+    sections as well as active and previous wars go to typed tables, all rows being
+    tagged with the save_id of their save. Rows are inserted with batched
+    `executemany` calls inside one transaction per save, so cross save questions
+    become indexed SQL queries instead of reparsing the saves.
+
+    Args:
+        database_path (Path | str): Path of the SQLite database, created if missing.
+        batch_size (int, optional): Number of rows gathered per table before inserting them. Defaults to 10000.
+    """
+
+    def __init__(self , database_path : Path | str , batch_size : int = 10000):
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(database_path)
+        self.connection.executescript(SCHEMA)
+        self._rows : dict[str, list[tuple]] = {}
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self , exc_type , exc_value , traceback) -> None:
+        self.close()
+
+    def _add_row(self , table : str , row : tuple) -> None:
+        rows = self._rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self._flush_table(table = table)
+
+    def _flush_table(self , table : str) -> None:
+        rows = self._rows.get(table)
+        if not rows:
+            return
+        placeholders = ', '.join('?' * len(rows[0]))
+        self.connection.executemany(f'INSERT INTO {table} VALUES ({placeholders})', rows)
+        rows.clear()
+
+    def _flush(self) -> None:
+        for table in list(self._rows):
+            self._flush_table(table = table)
+
+    @staticmethod
+    def _top_level_value(response : ParseResponse , key : str) -> str | None:
+        value = next(iter(response.get_by_search_term(OneLineKeyValueSearch(search_key = key))), None)
+        return None if value is None else normalize_value(value.data_value)
+
+    def _create_save(self , save_date : str , version : str | None , path : str | None) -> int:
+        previous = self.connection.execute('SELECT save_id FROM saves WHERE save_date = ?', (save_date,)).fetchone()
+        if previous is not None:
+            self.delete_save(save_id = previous[0])
+        order = sortable_value(save_date)
+        date_order = order[0] * 10000 + order[1] * 100 + order[2] if order is not None and len(order) == 3 else None
+        cursor = self.connection.execute(
+            'INSERT INTO saves (save_date, save_date_order, version, path) VALUES (?, ?, ?, ?)',
+            (save_date, date_order, version, path)
+        )
+        return cursor.lastrowid
+
+    def delete_save(self , save_id : int) -> None:
+        for table in SAVE_TABLES:
+            self.connection.execute(f'DELETE FROM {table} WHERE save_id = ?', (save_id,))
+        self.connection.execute('DELETE FROM saves WHERE save_id = ?', (save_id,))
+
+    def _store_nodes(self , save_id : int , info : InfoRepresentation , next_node_id : int) -> tuple[int, dict[int, int]]:
+        """Store a top level node and its whole subtree, returning the next free id and the ids given to its children."""
+        child_ids : dict[int, int] = {}
+        stack : list[tuple[InfoRepresentation, int | None, bool]] = [(info, None, True)]
+        while stack:
+            node , parent_id , direct_child = stack.pop()
+            node_id = next_node_id
+            next_node_id += 1
+            if parent_id is not None and direct_child:
+                child_ids[id(node)] = node_id
+            key , value , start_line , end_line = _node_row(info = node)
+            self._add_row(table = 'nodes', row = (save_id, node_id, parent_id, key, value, start_line, end_line))
+            is_root = node is info
+            stack.extend((child, node_id, is_root) for child in reversed(_children(info = node)))
+        return next_node_id, child_ids
+
+    def _store_section(self , save_id : int , info : InfoRepresentation , child_ids : dict[int, int]) -> None:
+        if isinstance(info , DictInfo) and info.key in WAR_KEYS:
+            pairs = info_pairs(info = info)
+            self._add_row(table = 'wars', row = (save_id, child_ids.get(id(info)), WAR_KEYS[info.key],
+                                                 *(_optional_value(pairs, key) for _ , key in WAR_COLUMNS)))
+            return
+        if not isinstance(info , DictInfo) or info.key not in SECTION_TABLES:
+            return
+        table , columns = SECTION_TABLES[info.key]
+        for child in info.value:
+            if not isinstance(child , DictInfo):
+                continue
+            pairs = info_pairs(info = child)
+            self._add_row(table = table, row = (save_id, child.key,
+                                                *(_optional_value(pairs, key) for _ , key in columns),
+                                                child_ids.get(id(child))))
+
+    def export(self ,
+               response : ParseResponse ,
+               save_date : str | None = None ,
+               path : Path | str | None = None
+               ) -> int:
+        """
+        Stream every top level node of a parsed save into the store and return its save_id.
+
+        A save already stored under the same date is replaced.
+        """
+        save_date = save_date or self._top_level_value(response = response , key = 'date')
+        if save_date is None:
+            raise ValueError('The save has no date, pass save_date explicitly.')
+        if path is None and response.session is not None:
+            path = response.session.path
+        version = self._top_level_value(response = response , key = 'version')
+
+        try:
+            with self.connection:
+                save_id = self._create_save(save_date = save_date , version = version ,
+                                            path = None if path is None else str(path))
+                next_node_id = 0
+                for info in response.generator:
+                    root_id = next_node_id
+                    next_node_id , child_ids = self._store_nodes(save_id = save_id , info = info ,
+                                                                 next_node_id = next_node_id)
+                    child_ids[id(info)] = root_id
+                    self._store_section(save_id = save_id , info = info , child_ids = child_ids)
+                self._flush()
+        finally:
+            # rows of a rolled back save must not be flushed with the next one
+            self._rows.clear()
+        return save_id
+
+    def export_file(self , file_path : Path , save_date : str | None = None) -> int:
+        with SaveSession(file_path) as session:
+            return self.export(response = session.parse_data() , save_date = save_date , path = file_path)
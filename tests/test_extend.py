@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from ck2_savefile.editor import EditorHandler
+from ck2_savefile.info_representation import DictInfo, OptionalKeyDict, OneLineKeyValueInfo
+from ck2_savefile.parser import SaveFileParser
+from ck2_savefile.search_type import DictSearch, OptionalKeyDictSearch
+from ck2_savefile.serializer import SaveFileSerializer
+from ck2_savefile.session import SaveSession
+
+SAMPLE_PATH = Path(__file__).parent / 'data' / 'sample.ck2'
+
+
+def character(file_path : Path , character_id : str) -> DictInfo:
+    response = SaveFileParser(file_path = file_path).parse_data()
+    return next(iter(response.get_by_search_term(DictSearch(search_key = 'character'),
+                                                 DictSearch(search_key = character_id , get_value_flag = False))))
+
+def apply(changes : list , file_path : Path) -> None:
+    editor = EditorHandler(changes = changes , file_path = SAMPLE_PATH)
+    editor.apply_changes()
+    editor.write_to_file(file_path)
+
+def dumped(file_path : Path) -> bytes:
+    with SaveSession(file_path) as session:
+        sink = session.path.with_suffix('.dump')
+        with sink.open('wb') as file:
+            SaveFileSerializer(sink = file , encoding = session.encoding).dump(session.parse_data())
+    return sink.read_bytes()
+
+def keys(block : DictInfo | OptionalKeyDict) -> list[str | None]:
+    return [getattr(value , 'key' , getattr(value , 'data_key' , None)) for value in block.value]
+
+
+def test_extend_leaves_given_nodes_untouched() -> None:
+    block = character(file_path = SAMPLE_PATH , character_id = '1000')
+    child = block.value[0]
+    nested = block.value[1]
+    index , nested_index = child.index , nested.index
+
+    changes = [block.extend(child),
+               block.extend({'key' : 'copy' , 'value' : [nested]} , class_type = DictInfo)]
+
+    assert (child.index , nested.index) == (index , nested_index)
+    child.change_value('"Edited"')
+    assert ''.join(changes[0].insertion_generator) == '\t\tbn="Pepin"\n'
+
+
+def test_extended_blocks_round_trip(tmp_path : Path) -> None:
+    block = character(file_path = SAMPLE_PATH , character_id = '1001')
+    flags = next(value for value in block.value if isinstance(value , OptionalKeyDict))
+    changes = [
+        block.extend({'key' : 'opt' , 'value' : {'id' : 7 , 'nested' : {'gold' : '1.000'}}} , class_type = OptionalKeyDict),
+        block.extend({'key' : 'dmn2' , 'value' : {'title' : '"k_x"'}} , class_type = DictInfo , position = 1),
+        flags.extend({'data_key' : 'married' , 'data_value' : 'yes'} , class_type = OneLineKeyValueInfo),
+    ]
+    output_path = tmp_path / 'extended.ck2'
+    apply(changes = changes , file_path = output_path)
+
+    extended = character(file_path = output_path , character_id = '1001')
+    assert keys(extended) == ['bn', 'dmn2', 'b_d', 'dnt', 'traits', 'attribute', 'health', 'dmn', 'flags', 'opt']
+    inserted = extended.value[-1]
+    assert isinstance(inserted , OptionalKeyDict)
+    assert keys(inserted) == ['id', 'nested']
+    assert keys(extended.value[-2]) == ['seen', 'married']
+    assert dumped(file_path = output_path) == output_path.read_bytes()
+
+
+def test_optional_key_dict_search_after_extend(tmp_path : Path) -> None:
+    block = character(file_path = SAMPLE_PATH , character_id = '1002')
+    output_path = tmp_path / 'extended.ck2'
+    apply(changes = [block.extend({'key' : 'opt' , 'value' : {'id' : 9}} , class_type = OptionalKeyDict)],
+          file_path = output_path)
+
+    response = SaveFileParser(file_path = output_path).parse_data()
+    found = list(response.get_by_search_term(DictSearch(search_key = 'character'),
+                                             DictSearch(search_key = '1002'),
+                                             OptionalKeyDictSearch(search_key = 'opt')))
+    assert [(value.data_key , value.data_value) for value in found] == [('id', '9')]
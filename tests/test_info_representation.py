@@ -0,0 +1,33 @@
+from array import array
+
+import pytest
+
+from ck2_savefile.info_representation import OneLineKeyListInfo, OneLineListInfo
+
+
+@pytest.mark.parametrize('line , items', [
+    ('\t\tatt={ 8 7 }\n', [8, 7]),
+    ('\t\tnames={ a b }\n', ['a', 'b']),
+    ('\t\tgold={1.500 2.250 }\n', [1.5, 2.25]),
+    ('\t\ttraits={1 5 22 40}\n', [1, 5, 22, 40]),
+    ('\t\tempty={ }\n', []),
+])
+def test_key_list_padding_is_not_an_item(line : str , items : list) -> None:
+    info = OneLineKeyListInfo.create(raw_info = line , index = 0)
+    assert len(info) == len(items)
+    assert list(info) == items
+    assert '' not in info
+    assert info.to_raw_string() == line
+
+
+def test_numeric_lists_are_compact_arrays() -> None:
+    assert isinstance(OneLineListInfo.create(raw_info = '1 5 22 40\n' , index = 0).info_list , array)
+    assert OneLineListInfo.create(raw_info = 'a b c\n' , index = 0).info_list == ['a', 'b', 'c']
+
+
+def test_membership_only_matches_exact_items() -> None:
+    info = OneLineListInfo.create(raw_info = '1 5 22 40\n' , index = 0)
+    assert 5 in info and 5.0 in info and '5' in info
+    assert 5.9 not in info and True not in info and '5.9' not in info and None not in info
+    assert info.intersects([5.9, 22]) and not info.intersects([5.9, True])
+    assert info.issuperset(['5', 22.0]) and not info.issuperset([5, 5.9])
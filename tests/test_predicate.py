@@ -0,0 +1,37 @@
+import pickle
+
+import pytest
+
+from ck2_savefile.predicate import Predicate, KeyEquals, KeyIn, KeyRange
+
+
+def test_predicate_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        Predicate()
+
+
+@pytest.mark.parametrize('bounds', [{'low' : 'abc'}, {'high' : 'k_france'}, {'low' : '1', 'high' : ''}])
+def test_key_range_rejects_bounds_that_are_not_sortable(bounds : dict) -> None:
+    with pytest.raises(ValueError):
+        KeyRange('b_d', **bounds)
+
+
+def test_key_range_checks_numbers_and_dates() -> None:
+    by_date = KeyRange('b_d', low = '700.1.1', high = '701.12.31')
+    assert by_date.check(pairs = {'b_d' : '"701.1.1"'})
+    assert not by_date.check(pairs = {'b_d' : '"702.1.1"'})
+    assert not by_date.check(pairs = {'b_d' : '"unknown"'})
+    assert not by_date.check(pairs = {})
+
+    by_number = KeyRange('health', low = 5)
+    assert by_number.check(pairs = {'health' : '5.000'})
+    assert not by_number.check(pairs = {'health' : '4.500'})
+
+
+def test_predicates_combine_and_pickle() -> None:
+    predicate = KeyEquals('dnt', 1234) & KeyIn('cul', ('"frankish"', 'saxon')) & KeyRange('health', high = 6)
+    restored = pickle.loads(pickle.dumps(predicate))
+    assert restored == predicate
+    assert hash(restored) == hash(predicate)
+    assert restored.check(pairs = {'dnt' : '1234', 'cul' : 'frankish', 'health' : '5.000'})
+    assert not restored.check(pairs = {'dnt' : '1234', 'cul' : 'frankish', 'health' : '7.000'})
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from ck2_savefile.parser import SaveFileParser
+from ck2_savefile.predicate import KeyEquals, KeyIn, KeyRange
+from ck2_savefile.response import ParseResponse
+from ck2_savefile.search_type import DictSearch, OneLineKeyValueSearch, OptionalKeyDictSearch
+from ck2_savefile.serializer import SaveFileSerializer
+from ck2_savefile.session import SaveSession
+
+SAMPLE_PATH = Path(__file__).parent / 'data' / 'sample.ck2'
+
+QUERIES = {
+    'top level optional key dict' : [OptionalKeyDictSearch(search_key = 'opt', get_value_flag = False)],
+    'top level optional key dict values' : [OptionalKeyDictSearch(search_key = 'opt')],
+    'optional key dict predicate' : [OptionalKeyDictSearch(search_func = KeyEquals('id', 5), get_value_flag = False)],
+    'dict by key' : [DictSearch(search_key = 'character'), DictSearch(search_key = '1001')],
+    'nested optional key dict' : [DictSearch(search_key = 'character'),
+                                  DictSearch(search_func = KeyEquals('bn', 'Odo')),
+                                  OptionalKeyDictSearch(search_key = 'flags')],
+    'dict predicate' : [DictSearch(search_key = 'character'),
+                        DictSearch(search_func = KeyIn('dnt', ('1234',)), get_value_flag = False,
+                                   multiple_values_flag = True)],
+    'dict range' : [DictSearch(search_key = 'character'),
+                    DictSearch(search_func = KeyRange('b_d', low = '701.1.1'), get_value_flag = False,
+                               multiple_values_flag = True)],
+    'value after pushed down terms' : [DictSearch(search_key = 'title'), DictSearch(search_key = 'k_france'),
+                                       OneLineKeyValueSearch(search_key = 'holder')],
+    'missing key' : [DictSearch(search_key = 'nothing')],
+}
+
+
+def rendered(response : ParseResponse) -> list[tuple[str, bytes]]:
+    return [(type(value).__name__, SaveFileSerializer.to_bytes(value)) for value in response.generator]
+
+def regular_response(response : ParseResponse) -> ParseResponse:
+    """The same response without the raw lines, so no search term is pushed down."""
+    return ParseResponse(first_line = response.first_line ,
+                         response_generator_func = response.response_generator_func)
+
+
+@pytest.mark.parametrize('terms', QUERIES.values(), ids = QUERIES.keys())
+def test_push_down_matches_regular_search(terms : list) -> None:
+    with SaveSession(SAMPLE_PATH) as session:
+        response = SaveFileParser(file_path = SAMPLE_PATH , session = session).parse_data()
+        assert response._count_push_down_terms(terms) > 0
+        pushed_down = rendered(response.get_by_search_term(*terms))
+        regular = rendered(regular_response(response = response).get_by_search_term(*terms))
+    assert pushed_down == regular
+
+
+def test_top_level_optional_key_dict_is_one_node() -> None:
+    response = SaveFileParser(file_path = SAMPLE_PATH).parse_data()
+    blocks = list(regular_response(response = response).get_by_search_term(
+        OptionalKeyDictSearch(search_key = 'opt', get_value_flag = False)))
+    assert len(blocks) == 1
+    assert [value.data_key for value in blocks[0].value] == ['id', 'gold']
@@ -0,0 +1,42 @@
+import io
+from pathlib import Path
+
+from ck2_savefile.info_representation import DictInfo
+from ck2_savefile.session import SaveSession
+from ck2_savefile.serializer import SaveFileSerializer
+
+SAMPLE_PATH = Path(__file__).parent / 'data' / 'sample.ck2'
+
+
+def dump(file_path : Path , newline : str = '\n') -> bytes:
+    sink = io.BytesIO()
+    with SaveSession(file_path) as session:
+        SaveFileSerializer(sink = sink , encoding = session.encoding , newline = newline).dump(session.parse_data())
+    return sink.getvalue()
+
+
+def test_dump_is_byte_identical() -> None:
+    assert dump(file_path = SAMPLE_PATH) == SAMPLE_PATH.read_bytes()
+
+
+def test_dump_small_batches_is_byte_identical() -> None:
+    sink = io.BytesIO()
+    with SaveSession(SAMPLE_PATH) as session:
+        SaveFileSerializer(sink = sink , encoding = session.encoding , batch_size = 1).dump(session.parse_data())
+    assert sink.getvalue() == SAMPLE_PATH.read_bytes()
+
+
+def test_dump_keeps_crlf_newlines(tmp_path : Path) -> None:
+    path = tmp_path / 'crlf.ck2'
+    path.write_bytes(SAMPLE_PATH.read_bytes().replace(b'\n', b'\r\n'))
+    assert dump(file_path = path , newline = '\r\n') == path.read_bytes()
+    assert dump(file_path = path) != path.read_bytes()
+
+
+def test_iter_lines_splits_on_newlines_only() -> None:
+    node = DictInfo.create_from_dict(input_dict = {'key' : 'name' ,
+                                                   'value' : {'text' : '"page\x0cbreak line\x85"'}})
+    lines = list(SaveFileSerializer.iter_lines(node = node))
+    assert lines == ['name=\n', '{\n', '\ttext="page\x0cbreak line\x85"\n', '}\n']
+    change = SaveFileSerializer.complex_change(node = node , insertion_index = 3)
+    assert list(change.insertion_generator) == lines
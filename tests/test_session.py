@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+from ck2_savefile.session import SaveSession, LINE_OFFSET_STRIDE
+
+SAMPLE_PATH = Path(__file__).parent / 'data' / 'sample.ck2'
+
+
+@pytest.fixture
+def small_save(tmp_path : Path) -> Path:
+    path = tmp_path / 'small.ck2'
+    path.write_bytes(b'CK2txt\nid=1\n}\n')
+    return path
+
+
+def test_cursor_matches_text_mode_reading() -> None:
+    with SAMPLE_PATH.open('r') as file:
+        expected = list(enumerate(file))
+    with SaveSession(SAMPLE_PATH) as session:
+        assert list(session.cursor()) == expected
+        assert list(session.cursor(start_line = 40)) == expected[40:]
+        assert session.line_count == len(expected)
+
+
+def test_cursor_normalizes_crlf(tmp_path : Path) -> None:
+    path = tmp_path / 'crlf.ck2'
+    path.write_bytes(b'CK2txt\r\nid=1\r\n}\r\n')
+    with SaveSession(path) as session:
+        assert list(session.cursor()) == [(0, 'CK2txt\n'), (1, 'id=1\n'), (2, '}\n')]
+
+
+@pytest.mark.parametrize('build_table', [False, True])
+def test_line_offset_bounds(small_save : Path , build_table : bool) -> None:
+    with SaveSession(small_save) as session:
+        if build_table:
+            assert session.line_count == 3
+        assert session.line_offset(1) == len(b'CK2txt\n')
+        assert session.line_offset(3) == len(b'CK2txt\nid=1\n}\n')
+        assert list(session.cursor(start_line = 3)) == []
+        for line_index in (-1, 4, LINE_OFFSET_STRIDE - 1):
+            with pytest.raises(IndexError):
+                session.line_offset(line_index)
+            with pytest.raises(IndexError):
+                list(session.cursor(start_line = line_index))
+
+
+def test_line_offset_without_final_newline(tmp_path : Path) -> None:
+    path = tmp_path / 'no_newline.ck2'
+    path.write_bytes(b'CK2txt\nid=1\n}')
+    with SaveSession(path) as session:
+        assert session.line_offset(2) == len(b'CK2txt\nid=1\n')
+        assert session.line_offset(3) == len(b'CK2txt\nid=1\n}')
+        with pytest.raises(IndexError):
+            session.line_offset(4)
+        assert session.read_line(2) == '}'